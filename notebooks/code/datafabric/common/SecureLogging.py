@@ -13,10 +13,103 @@ Usage:
 """
 
 import re
+import sys
+import atexit
 import hashlib
-from datetime import datetime
+import threading
+import traceback
+import weakref
+from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional, Dict, Any
 
+# RE2 guarantees linear-time matching on untrusted exception text; the
+# stdlib engine is used when google-re2 / pyre2 is not installed
+try:
+    import re2 as regex_engine
+except ImportError:
+    regex_engine = re
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    from pyspark.sql import SparkSession
+    from pyspark.sql.types import MapType, StringType, StructField, StructType
+except ImportError:
+    SparkSession = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+@lru_cache(maxsize=None)
+def _log_schema():
+    """
+    Schema of the secure Delta log table, built once on first use.
+    Passed to createDataFrame so Spark skips schema inference.
+    """
+    return StructType([
+        StructField("timestamp", StringType()),
+        StructField("process", StringType()),
+        StructField("error_type", StringType()),
+        StructField("error_hash", StringType()),
+        StructField("message", StringType()),
+        StructField("task_id", StringType()),
+        StructField("context", MapType(StringType(), StringType()), True),
+        StructField("full_traceback", StringType()),
+        StructField("logged_at", StringType()),
+    ])
+
+
+@lru_cache(maxsize=None)
+def _arrow_log_schema():
+    """Arrow equivalent of _log_schema(), for building log batches as Arrow tables."""
+    return pa.schema([
+        ("timestamp", pa.string()),
+        ("process", pa.string()),
+        ("error_type", pa.string()),
+        ("error_hash", pa.string()),
+        ("message", pa.string()),
+        ("task_id", pa.string()),
+        ("context", pa.map_(pa.string(), pa.string())),
+        ("full_traceback", pa.string()),
+        ("logged_at", pa.string()),
+    ])
+
+
+def _build_trigger_automaton(pattern_triggers):
+    """
+    Build an Aho-Corasick automaton mapping each trigger literal to the index
+    of its pattern, so all candidate patterns are found in one pass.
+    Returns None when pyahocorasick is not installed.
+    """
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for index, triggers in enumerate(pattern_triggers):
+        for trigger in triggers:
+            automaton.add_word(trigger, index)
+    automaton.make_automaton()
+    return automaton
+
+
+# Loggers with a log_table, flushed once at interpreter exit. Held weakly so
+# loggers can still be collected; a logger with buffered entries is kept
+# alive by its pending flush timer until the entries are written.
+_LOGGERS_TO_FLUSH = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_loggers():
+    """Write the buffered log entries of every live logger."""
+    for logger in list(_LOGGERS_TO_FLUSH):
+        logger.flush()
+
 
 class SecureLogger:
     """
@@ -24,7 +117,9 @@ class SecureLogger:
     Redacts common secret patterns and provides safe error logging.
     """
     
-    # Patterns that indicate sensitive data - will be redacted
+    # Patterns that indicate sensitive data - will be redacted.
+    # Must stay RE2-compatible: no backreferences or lookarounds in the
+    # pattern itself (\1 in the replacement is fine).
     REDACTION_PATTERNS = [
         # Connection strings
         (r'(password|pwd)\s*[=:]\s*[^\s;]+', r'\1=***REDACTED***'),
@@ -48,11 +143,95 @@ class SecureLogger:
         # IP addresses
         (r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b', '***IP_REDACTED***'),
         
-        # Email addresses
-        (r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', '***EMAIL_REDACTED***'),
+        # Email addresses. A match starts at a token boundary (the preceding
+        # character is consumed and put back, as RE2 has no lookbehind), so
+        # the whole address is redacted and each run of word characters is
+        # scanned from its start only once. Addresses glued to the previous
+        # one are taken by the repetition; domain parts stay bounded to
+        # RFC 5321 lengths.
+        (r'(^|[^a-zA-Z0-9._%+-])(?:[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]{1,255}\.[a-zA-Z]{2,63})+', r'\1***EMAIL_REDACTED***'),
     ]
     
-    def __init__(self, dbutils=None, log_table: str = None, max_message_length: int = 500):
+    # Lowercase literals, one tuple per entry in REDACTION_PATTERNS, at least
+    # one of which must be present for that pattern to be able to match
+    REDACTION_TRIGGERS = [
+        ("password", "pwd"),
+        ("server", "host"),
+        ("user", "uid"),
+        ("api",),
+        ("bearer", "token"),
+        ("authorization",),
+        ("accountkey", "sharedaccesssignature"),
+        ("defaultendpointsprotocol=https;",),
+        ("aws",),
+        ("/dbfs/mnt/",),
+        ("abfss://",),
+        (".",),
+        ("@",),
+    ]
+    
+    # Non-ASCII characters that re.IGNORECASE treats as equal to an ASCII
+    # letter but str.lower() does not map onto it
+    _CASE_FOLD_FIXES = str.maketrans({
+        "\u0130": "i",  # LATIN CAPITAL LETTER I WITH DOT ABOVE
+        "\u0131": "i",  # LATIN SMALL LETTER DOTLESS I
+        "\u017f": "s",  # LATIN SMALL LETTER LONG S
+        "\u212a": "k",  # KELVIN SIGN
+    })
+    
+    # Compiled once at import and shared by every logger instance
+    _COMPILED_PATTERNS = tuple(
+        (regex_engine.compile("(?i)" + pattern), replacement)
+        for pattern, replacement in REDACTION_PATTERNS
+    )
+    _TRIGGER_AUTOMATON = _build_trigger_automaton(REDACTION_TRIGGERS)
+    # Bound sub() methods, so the redaction loop does no attribute lookups
+    _SUBSTITUTIONS = tuple(
+        (pattern.sub, replacement) for pattern, replacement in _COMPILED_PATTERNS
+    )
+    
+    # Length of the shortest text any pattern can match, e.g. "pwd=x"
+    _MIN_REDACTABLE_LENGTH = 5
+    
+    # Every pattern needs one of these ASCII characters: a separator
+    # (= : / @ .) or whitespace as matched by \s (bearer/token values)
+    _REQUIRED_CHARS = b"=:/@. \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+    
+    # Input beyond max_message_length * this factor is cut before redaction;
+    # the slack leaves room for redactions shrinking the displayed text
+    _REDACTION_BUDGET_FACTOR = 4
+    
+    # Characters an IP address or email match can contain. A budget cut inside
+    # a run of these backs up to the run start, at most the longest such token
+    # (an RFC 5321 email, 64 + 1 + 255); longer runs keep the hard cut.
+    _TOKEN_RUN = re.compile(r"[a-zA-Z0-9._%+@-]*")
+    _MAX_SPLIT_TOKEN_LENGTH = 320
+    
+    # Joins values for batch sanitization; not whitespace, so \s never spans it
+    _VALUE_SEPARATOR = "\x00"
+    
+    # Notebook output of log_error, filled from the safe error record
+    _ERROR_TEMPLATE = (
+        "❌ [{error_type}] {process} failed\n"
+        "   Error ID: {error_hash}\n"
+        "   Task ID: {task_id}\n"
+        "   Message: {message}\n"
+    )
+    _STORED_TEMPLATE = "   📋 Full traceback stored in: {log_table}\n"
+    _QUEUED_TEMPLATE = "   📋 Full traceback queued for: {log_table}\n"
+    
+    # Detailed log entries from log_error(flush=False) are buffered and
+    # appended to log_table in batches
+    LOG_BATCH_SIZE = 64
+    LOG_FLUSH_INTERVAL_SECONDS = 5.0
+    
+    def __init__(
+        self,
+        dbutils=None,
+        log_table: str = None,
+        max_message_length: int = 500,
+        quiet: bool = False
+    ):
         """
         Initialize the secure logger.
         
@@ -60,13 +239,35 @@ class SecureLogger:
             dbutils: Databricks dbutils object (optional, for secret scope access)
             log_table: Delta table to store detailed logs (optional)
             max_message_length: Maximum length of error messages to display
+            quiet: If True, suppress notebook output (log_table storage is unaffected)
         """
         self.dbutils = dbutils
         self.log_table = log_table
         self.max_message_length = max_message_length
-        self._compiled_patterns = [
-            (re.compile(pattern, re.IGNORECASE), replacement) 
-            for pattern, replacement in self.REDACTION_PATTERNS
+        self.quiet = quiet
+        # Exceptions are often re-logged by retry loops and nested handlers;
+        # caching skips str() on Spark/Py4J exceptions with expensive __str__
+        self._hash_cache = weakref.WeakKeyDictionary()
+        self._spark = None
+        self._log_buffer = []
+        self._buffer_lock = threading.Lock()
+        self._flush_timer = None
+        if log_table:
+            _LOGGERS_TO_FLUSH.add(self)
+    
+    def _fold(self, text: str) -> str:
+        """Lowercase text the way the IGNORECASE patterns compare it."""
+        if text.isascii():
+            return text.lower()
+        return text.translate(self._CASE_FOLD_FIXES).lower()
+    
+    def _candidate_patterns(self, folded: str) -> list:
+        """Return the sorted indexes of patterns whose triggers occur in folded text."""
+        if self._TRIGGER_AUTOMATON is not None:
+            return sorted({index for _, index in self._TRIGGER_AUTOMATON.iter(folded)})
+        return [
+            index for index, triggers in enumerate(self.REDACTION_TRIGGERS)
+            if any(trigger in folded for trigger in triggers)
         ]
     
     def sanitize(self, text: str) -> str:
@@ -82,24 +283,104 @@ class SecureLogger:
         if not text:
             return ""
         
-        sanitized = str(text)
-        for pattern, replacement in self._compiled_patterns:
-            sanitized = pattern.sub(replacement, sanitized)
+        text, cut = self._pre_truncate(str(text))
+        return self._truncate(self._redact(text), force=cut)
+    
+    def _pre_truncate(self, text: str) -> tuple:
+        """
+        Cut text to a bounded redaction budget before scanning, so huge JVM
+        tracebacks are not scanned past what can be displayed.
         
-        # Truncate if too long
-        if len(sanitized) > self.max_message_length:
-            sanitized = sanitized[:self.max_message_length] + "... [truncated]"
+        Returns:
+            Tuple of (possibly cut text, whether it was cut)
+        """
+        budget = self.max_message_length * self._REDACTION_BUDGET_FACTOR
+        if len(text) <= budget:
+            return text, False
+        head = text[:budget]
+        if self._TOKEN_RUN.match(text, budget, budget + 1).end() > budget:
+            # The token crossing the cut (e.g. half an IP address or email)
+            # would no longer match its pattern - drop it instead of showing it.
+            # The run is measured on the reversed tail, so this stays O(bound).
+            window = head[:-self._MAX_SPLIT_TOKEN_LENGTH - 2:-1]
+            run = self._TOKEN_RUN.match(window).end()
+            if run < len(window):
+                head = head[:budget - run]
+        return head, True
+    
+    def _redact(self, text: str) -> str:
+        """Apply the redaction patterns to text, without truncating it."""
+        if len(text) < self._MIN_REDACTABLE_LENGTH:
+            return text
+        # Identifiers such as process names and task IDs contain none of the
+        # characters every pattern needs - checked with one C-level pass
+        if text.isascii():
+            stripped = text.encode("ascii").translate(None, self._REQUIRED_CHARS)
+            if len(stripped) == len(text):
+                return text
         
-        return sanitized
+        # Only run patterns whose trigger literal is present - most log lines
+        # contain none. Patterns overlap (e.g. "Authorization: Bearer <token>")
+        # so the candidates still run in declaration order; no replacement
+        # introduces a trigger of a later pattern, so candidates are found once.
+        substitutions = self._SUBSTITUTIONS
+        for index in self._candidate_patterns(self._fold(text)):
+            sub, replacement = substitutions[index]
+            text = sub(replacement, text)
+        return text
+    
+    def _sanitize_values(self, values: list) -> list:
+        """
+        Sanitize several strings with a single redaction pass over their
+        concatenation, falling back to one pass per value if a match crosses
+        a value boundary.
+        """
+        separator = self._VALUE_SEPARATOR
+        bounded, cuts = zip(*map(self._pre_truncate, values)) if values else ((), ())
+        joined = separator.join(bounded)
+        if joined.count(separator) == len(values) - 1:
+            # Replacements never contain the separator, so a match spanning
+            # two values shows up as a missing part
+            parts = self._redact(joined).split(separator)
+            if len(parts) == len(values):
+                return [self._truncate(part, force=cut) for part, cut in zip(parts, cuts)]
+        return [self.sanitize(value) for value in values]
+    
+    def _truncate(self, text: str, force: bool = False) -> str:
+        """Truncate text to max_message_length, or mark it truncated if force is set."""
+        if force or len(text) > self.max_message_length:
+            return text[:self.max_message_length] + "... [truncated]"
+        return text
     
     def get_safe_exception_type(self, exception: Exception) -> str:
         """Get the exception type name safely."""
         return type(exception).__name__
     
-    def get_error_hash(self, exception: Exception) -> str:
-        """Generate a hash for error correlation without exposing details."""
-        error_str = f"{type(exception).__name__}:{str(exception)[:100]}"
-        return hashlib.sha256(error_str.encode()).hexdigest()[:12]
+    def get_error_hash(self, exception: Exception, exc_str: Optional[str] = None) -> str:
+        """
+        Generate a hash for error correlation without exposing details.
+        
+        Args:
+            exception: The exception to hash
+            exc_str: str(exception), if the caller has already computed it
+        """
+        try:
+            return self._hash_cache[exception]
+        except (KeyError, TypeError):
+            pass
+        
+        # Non-cryptographic correlation ID: a 6-byte BLAKE2b digest is exactly
+        # the 12 hex characters shown to users
+        error_bytes = b":".join((
+            type(exception).__name__.encode("utf-8", "replace"),
+            (str(exception) if exc_str is None else exc_str)[:100].encode("utf-8", "replace"),
+        ))
+        error_hash = hashlib.blake2b(error_bytes, digest_size=6).hexdigest()
+        try:
+            self._hash_cache[exception] = error_hash
+        except TypeError:
+            pass  # unhashable, or a built-in type that has no weak references
+        return error_hash
     
     def log_error(
         self, 
@@ -107,7 +388,8 @@ class SecureLogger:
         exception: Exception, 
         task_id: Optional[str] = None,
         context: Optional[Dict[str, Any]] = None,
-        include_traceback: bool = False
+        include_traceback: bool = False,
+        flush: bool = True
     ) -> Dict[str, Any]:
         """
         Log an error safely without exposing sensitive information.
@@ -118,16 +400,19 @@ class SecureLogger:
             task_id: Optional task identifier for correlation
             context: Optional dict of additional context (will be sanitized)
             include_traceback: If True, stores full traceback in secure location
+            flush: If True (default), write the stored traceback before returning, so it
+                is not lost when the job ends right after a fatal error. Retry loops
+                logging many recoverable errors can pass False to batch the writes.
             
         Returns:
             Dict with safe error information for display
         """
-        import traceback as tb
-        
-        error_hash = self.get_error_hash(exception)
+        # str() can be a remote call for Py4J-backed exceptions - do it once
+        exc_str = str(exception)
+        error_hash = self.get_error_hash(exception, exc_str)
         error_type = self.get_safe_exception_type(exception)
-        safe_message = self.sanitize(str(exception))
-        timestamp = datetime.utcnow().isoformat()
+        safe_message = self.sanitize(exc_str)
+        timestamp = datetime.now(timezone.utc).isoformat()
         
         # Build safe error record
         safe_record = {
@@ -141,47 +426,135 @@ class SecureLogger:
         
         # Sanitize context if provided
         if context:
+            # Numeric values cannot hold secrets - only text values are scanned
+            text_keys = [k for k, v in context.items() if not isinstance(v, (int, float, bool))]
+            sanitized = dict(zip(
+                text_keys,
+                self._sanitize_values([str(context[k]) for k in text_keys])
+            ))
             safe_record["context"] = {
-                k: self.sanitize(str(v)) for k, v in context.items()
+                k: sanitized[k] if k in sanitized else self._truncate(str(v))
+                for k, v in context.items()
             }
         
-        # Print safe version to notebook output
-        print(f"❌ [{error_type}] {process_name} failed")
-        print(f"   Error ID: {error_hash}")
-        print(f"   Task ID: {task_id or 'N/A'}")
-        print(f"   Message: {safe_message}")
-        
         # Store full details securely if log table configured
+        status = None
         if self.log_table and include_traceback:
-            full_traceback = tb.format_exc()
-            self._store_secure_log(safe_record, full_traceback)
-            print(f"   📋 Full traceback stored in: {self.log_table}")
+            full_traceback = traceback.format_exc()
+            status = self._store_secure_log(safe_record, full_traceback, logged_at=timestamp, flush=flush)
+        
+        # Print safe version to notebook output in a single write
+        if not self.quiet:
+            output = self._ERROR_TEMPLATE.format_map(safe_record)
+            if status == "stored":
+                output += self._STORED_TEMPLATE.format(log_table=self.log_table)
+            elif status == "queued":
+                output += self._QUEUED_TEMPLATE.format(log_table=self.log_table)
+            sys.stdout.write(output)
         
         return safe_record
     
-    def _store_secure_log(self, safe_record: Dict, full_traceback: str):
-        """Store detailed error log in secure Delta table."""
+    def _store_secure_log(
+        self,
+        safe_record: Dict,
+        full_traceback: str,
+        logged_at: Optional[str] = None,
+        flush: bool = False
+    ) -> Optional[str]:
+        """
+        Queue a detailed error log entry for the secure Delta table. With flush
+        set, the entry and everything buffered before it are written on the
+        caller's thread instead of waiting for the batch or the flush timer.
+        
+        Returns:
+            "stored" if the entry was written with a full batch, "queued" if it
+            waits for the next flush, None if it could not be stored
+        """
+        if SparkSession is None:
+            self._warn("   ⚠️ Could not store detailed log: pyspark is not available")
+            return None
+        
+        # Create log entry with full details (stored securely, not printed)
+        log_entry = {
+            **safe_record,
+            "full_traceback": full_traceback,
+            "logged_at": logged_at or datetime.now(timezone.utc).isoformat()
+        }
+        
+        batch = None
+        with self._buffer_lock:
+            self._log_buffer.append(log_entry)
+            if flush or len(self._log_buffer) >= self.LOG_BATCH_SIZE:
+                batch, self._log_buffer = self._log_buffer, []
+                self._cancel_flush_timer()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.LOG_FLUSH_INTERVAL_SECONDS, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        
+        if batch:
+            return "stored" if self._write_log_batch(batch) else None
+        return "queued"
+    
+    def _warn(self, message: str):
+        """Print a logging problem, unless quiet (also called from the flush timer thread)."""
+        if not self.quiet:
+            print(message)
+    
+    def _cancel_flush_timer(self):
+        """Cancel the pending flush timer. Caller must hold _buffer_lock."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+    
+    def flush(self):
+        """Write any buffered log entries to the secure Delta table."""
+        with self._buffer_lock:
+            batch, self._log_buffer = self._log_buffer, []
+            self._cancel_flush_timer()
+        
+        if batch:
+            self._write_log_batch(batch)
+    
+    def _write_log_batch(self, batch: list) -> bool:
+        """Append a batch of log entries to the secure Delta table. Returns True if written."""
         try:
-            from pyspark.sql import SparkSession
-            spark = SparkSession.builder.getOrCreate()
-            
-            # Create log entry with full details (stored securely, not printed)
-            log_entry = {
-                **safe_record,
-                "full_traceback": full_traceback,
-                "logged_at": datetime.utcnow().isoformat()
-            }
+            if self._spark is None:
+                self._spark = SparkSession.builder.getOrCreate()
             
             # Append to Delta table
-            df = spark.createDataFrame([log_entry])
+            df = self._create_log_dataframe(batch)
             df.write.format("delta").mode("append").saveAsTable(self.log_table)
+            return True
             
         except Exception as log_error:
             # Don't fail the main process if logging fails
-            print(f"   ⚠️ Could not store detailed log: {type(log_error).__name__}")
+            self._warn(f"   ⚠️ Could not store {len(batch)} detailed log(s): {type(log_error).__name__}")
+            return False
+    
+    def _create_log_dataframe(self, batch: list):
+        """
+        Build a DataFrame from a batch of log entries.
+        
+        Spark 4+ accepts an Arrow table directly, which is transferred as one
+        Arrow buffer instead of converting every row through Py4J. Older
+        Spark versions, or environments without pyarrow, use explicit rows.
+        """
+        if pa is not None and int(self._spark.version.split(".")[0]) >= 4:
+            try:
+                table = pa.Table.from_pylist(batch, schema=_arrow_log_schema())
+                return self._spark.createDataFrame(table)
+            except Exception:
+                pass  # fall back to the row-based path below
+        
+        schema = _log_schema()
+        rows = [tuple(entry.get(field.name) for field in schema.fields) for entry in batch]
+        return self._spark.createDataFrame(rows, schema=schema)
     
     def log_warning(self, process_name: str, message: str, task_id: Optional[str] = None):
         """Log a warning message safely."""
+        if self.quiet:
+            return
         safe_message = self.sanitize(message)
         print(f"⚠️ [{process_name}] Warning: {safe_message}")
         if task_id:
@@ -189,10 +562,18 @@ class SecureLogger:
     
     def log_info(self, process_name: str, message: str):
         """Log an info message safely."""
+        if self.quiet:
+            return
         safe_message = self.sanitize(message)
         print(f"ℹ️ [{process_name}] {safe_message}")
 
 
+@lru_cache(maxsize=8)
+def _get_logger(max_length: int) -> SecureLogger:
+    """Shared SecureLogger per max_length, so patterns are not recompiled per call."""
+    return SecureLogger(max_message_length=max_length)
+
+
 # Convenience function for quick usage
 def safe_error_message(exception: Exception, max_length: int = 200) -> str:
     """
@@ -202,5 +583,5 @@ def safe_error_message(exception: Exception, max_length: int = 200) -> str:
         except Exception as e:
             print(f"Error: {safe_error_message(e)}")
     """
-    logger = SecureLogger(max_message_length=max_length)
+    logger = _get_logger(max_length)
     return f"{logger.get_safe_exception_type(exception)}: {logger.sanitize(str(exception))}"
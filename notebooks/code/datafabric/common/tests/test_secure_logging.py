@@ -0,0 +1,113 @@
+import unittest, timeit, os, sys, gc
+from unittest import mock
+# SecureLogging.py lives in the parent directory, which is not a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import SecureLogging
+from SecureLogging import SecureLogger
+
+class TestSecureLogging(unittest.TestCase):
+
+    #
+    # Secrets crossing the redaction budget cut must not be shown partially
+    #
+    def test_ip_across_budget_cut(self):
+        logger = SecureLogger()
+        text = 'Failed reading /dbfs/mnt/' + 'q'*1960 + ' from 10.20.30.40 retry'
+        assert( '10.20' not in logger.sanitize(text) )
+        assert( logger.sanitize(text).endswith("... [truncated]") )
+
+    def test_email_across_budget_cut(self):
+        logger = SecureLogger(max_message_length=50)
+        for padding in range(150, 260):
+            text = 'x '*(padding//2) + 'contact john.doe@contoso.com or 10.20.30.40 now'
+            for sanitized in (logger.sanitize(text), logger._sanitize_values([text, 'ok'])[0]):
+                assert( 'john' not in sanitized and 'contoso' not in sanitized and '10.20' not in sanitized )
+
+    def test_no_whitespace_before_budget_cut(self):
+        logger = SecureLogger()
+        assert( logger.sanitize('x'*2500) == 'x'*500 + "... [truncated]" )
+        assert( logger.sanitize('Error: ' + 'QmFzZTY0'*400) == ('Error: ' + 'QmFzZTY0'*400)[:500] + "... [truncated]" )
+
+    #
+    # Email redaction covers the whole address and stays linear on adversarial input
+    #
+    def test_long_email_local_part(self):
+        logger = SecureLogger()
+        assert( logger.sanitize('john.smith.'*7 + '@contoso.com') == '***EMAIL_REDACTED***' )
+        assert( logger.sanitize('to a@b.com+c.d@e.org, <f@g.net>') == 'to ***EMAIL_REDACTED***, <***EMAIL_REDACTED***>' )
+
+    def test_email_scan_time(self):
+        logger = SecureLogger(max_message_length=5000)
+        inputs = ['a'*4999 + '@', 'a@'*2500, 'a@' + 'b'*4998, ('-@' + 'b'*300)*16, (' x@' + 'y'*254 + '.')*19, 'x@y.co'*833]
+        for text in inputs:
+            assert( len(text) >= 4800 )
+            elapsed = min(timeit.repeat(lambda: logger.sanitize(text), number=1, repeat=5))
+            assert( elapsed < 0.01 ), (text[:20], elapsed)
+
+    def test_redaction_within_budget(self):
+        logger = SecureLogger()
+        assert( logger.sanitize('from 10.20.30.40 retry') == 'from ***IP_REDACTED*** retry' )
+
+
+    #
+    # Trigger prefilter and case folding
+    #
+    def test_candidate_patterns_without_automaton(self):
+        logger = SecureLogger()
+        texts = ['password=x', 'Bearer abc', 'see /dbfs/mnt/a and 1.2.3.4', 'AWS_SECRET=x user id=y', 'nothing here', '']
+        with_automaton = [logger._candidate_patterns(logger._fold(t)) for t in texts]
+        with mock.patch.object(SecureLogger, '_TRIGGER_AUTOMATON', None):
+            assert( [logger._candidate_patterns(logger._fold(t)) for t in texts] == with_automaton )
+        assert( logger._candidate_patterns('nothing here') == [] )
+
+    def test_text_without_triggers_is_unchanged(self):
+        logger = SecureLogger()
+        for text in ['task_42', 'LoadCustomers failed', 'Übersicht ñ 日本語 x=1']:
+            assert( logger.sanitize(text) == text )
+
+    def test_case_folded_triggers(self):
+        logger = SecureLogger()
+        assert( logger.sanitize('PASSWORD=hunter2') == 'PASSWORD=***REDACTED***' )
+        # KELVIN SIGN matches k under re.IGNORECASE but str.lower() keeps it
+        assert( logger.sanitize('to\u212aen abc123') == 'to\u212aen ***REDACTED***' )
+        assert( logger.sanitize('\u212aey') == '\u212aey' )
+
+    #
+    # Detailed log batching
+    #
+    def _raise_and_log(self, logger, **kwargs):
+        try:
+            raise ValueError("boom")
+        except ValueError as e:
+            return logger.log_error("proc", e, include_traceback=True, **kwargs)
+
+    def test_log_batching(self):
+        written = []
+        with mock.patch.object(SecureLogging, 'SparkSession', object), \
+             mock.patch.object(SecureLogger, '_write_log_batch', lambda self, batch: written.append(len(batch)) or True):
+            logger = SecureLogger(log_table="db.logs", quiet=True)
+            logger.LOG_BATCH_SIZE = 3
+            self._raise_and_log(logger, flush=False)
+            self._raise_and_log(logger, flush=False)
+            assert( written == [] and len(logger._log_buffer) == 2 and logger._flush_timer is not None )
+            self._raise_and_log(logger, flush=False)
+            assert( written == [3] and logger._log_buffer == [] and logger._flush_timer is None )
+            # the default writes on the caller's thread, with anything queued before it
+            self._raise_and_log(logger, flush=False)
+            self._raise_and_log(logger)
+            assert( written == [3, 2] )
+            self._raise_and_log(logger, flush=False)
+            SecureLogging._flush_loggers()
+            assert( written == [3, 2, 1] )
+
+    def test_flushed_loggers_are_not_kept_alive(self):
+        logger = SecureLogger(log_table="db.logs", quiet=True)
+        assert( logger in SecureLogging._LOGGERS_TO_FLUSH )
+        count = len(SecureLogging._LOGGERS_TO_FLUSH)
+        del logger
+        gc.collect()
+        assert( len(SecureLogging._LOGGERS_TO_FLUSH) == count - 1 )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,4 @@
-import re, functools
+import re, sys, functools
 from collections import ChainMap
 from databricksx12.format import *
 
@@ -281,6 +281,16 @@ class Segment():
         except:
             return dne
 
+    #
+    # @param start - first element number to return
+    # @param stop - element number to stop before
+    # @param dne - "Does Not Exist" value used for elements past the end of the segment
+    # @returns a list of (stop - start) element strings, splitting the segment once
+    #
+    def elements_slice(self, start, stop, dne=""):
+        elements = self.data.split(self.format_cls.ELEMENT_DELIM)[start:stop]
+        return elements + [dne] * (stop - start - len(elements))
+
     #
     # @returns number of elements in a segment 
     #
@@ -297,7 +307,15 @@ class Segment():
     # First element is the segment name
     #
     def segment_name(self):
-        return self.data.split(self.format_cls.ELEMENT_DELIM)[0]
+        return self._segment_name
+
+    #
+    # Segment names are compared on every loop/transaction scan, so split once
+    #  and intern the result (not pickled, recomputed on first use after loads())
+    #
+    @functools.cached_property
+    def _segment_name(self):
+        return sys.intern(self.data.split(self.format_cls.ELEMENT_DELIM)[0])
 
     #
     # Filter this segment for element/sub_element values
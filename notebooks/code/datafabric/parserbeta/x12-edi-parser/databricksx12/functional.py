@@ -33,7 +33,7 @@ class FunctionalGroup(EDI):
     #
     def transaction_segments(self):
         from databricksx12.transaction import Transaction
-        return [Transaction(self.segments_by_position(a,b), self.format_cls, self.transaction_type) for a,b in self._transaction_locations()]
+        return Transaction.from_segment_groups([self.segments_by_position(a,b) for a,b in self._transaction_locations()], self.format_cls, self.transaction_type)
 
 
     #
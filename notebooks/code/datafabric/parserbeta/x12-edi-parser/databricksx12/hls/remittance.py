@@ -1,5 +1,6 @@
+from databricksx12.edi import Segment
 from databricksx12.hls.claim import MedicalClaim
-import functools
+from functools import cached_property
 
 
 #
@@ -10,6 +11,194 @@ class Remittance(MedicalClaim):
 
     NAME = "835"
 
+    #
+    # element names in segment order, starting at element 1
+    #
+    BPR_KEYS = (
+        "transaction_handling_code",
+        "total_actual_provider_payment_amt",
+        "creditor_debit_flag_code",
+        "payment_method_code",
+        "payment_format_code",
+        "sender_dfiid_number_qualifier",
+        "sender_dfi_identifier",
+        "sender_account_number_qualifier",
+        "sender_bank_acct_number",
+        "payer_identifier",
+        "payer_originating_co_supplemental_code",
+        "receiver_dfiid_number_qualifier",
+        "receiver_or_provider_bank_id_number",
+        "receiver_acct_number_qualifier",
+        "receiver_or_provider_account_number",
+        "check_issue_or_eft_effective_date",
+        "business_function_code",
+    )
+
+    TS3_KEYS = (
+        "provider_identifier",
+        "facility_code_value",
+        "fiscal_period_date",
+        "total_claim_count",
+        "total_claim_change_amount",
+        "total_covered_charge_amount",
+        "total_noncovered_charge_amount",
+        "total_denied_charge_amount",
+        "total_provider_amount",
+        "total_interest_amount",
+        "total_contractual_adjustment_amount",
+        "total_gramm_rudman_reduction_amount",
+        "total_msp_payer_amount",
+        "total_blood_deductible_amount",
+        "total_non_lab_charge_amount",
+        "total_coinsurance_amount",
+        "total_hcpcs_reported_charge_amount",
+        "total_hcpcs_payable_amount",
+        "total_deductible_amount",
+        "total_professional_component_amount",
+        "total_msp_patient_liability_met_amount",
+        "total_patient_reimbursement_amount",
+        "total_pip_claim_count",
+        "total_pip_adjustment_amount",
+    )
+
+    TS2_KEYS = (
+        "total_drg_amount",
+        "total_federal_specific_amount",
+        "total_hospital_specific_amount",
+        "total_disproportionate_amount",
+        "total_capital_amount",
+        "total_indirect_medical_education_amount",
+        "total_outlier_day_count",
+        "total_day_outlier_amount",
+        "total_cost_outlier_amount",
+        "average_drg_length_of_stay",
+        "total_discharge_count",
+        "total_cost_report_day_count",
+        "total_covered_day_count",
+        "total_noncovered_day_count",
+        "total_msp_pass_through_amount",
+        "average_drg_weight",
+        "total_pps_capital_fsp_drg_amount",
+        "total_psp_capital_hsp_drg_amount",
+        "total_pps_dsh_drg_amount",
+    )
+
+    CLP_KEYS = (
+        "patient_control_number",
+        "claim_status_code",
+        "total_claim_charge_amount",
+        "claim_payment_amount",
+        "patient_responsibility_amount",
+        "claim_filing_indicator_code",
+        "payer_claim_control_number",
+        "facility_code_value",
+        "claim_frequency_code",
+        "patient_status_code",
+        "drg_code",
+        "drg_weight",
+        "discharge_fraction",
+        "yes_no_condition_or_response_code",
+    )
+
+    MIA_KEYS = (
+        "covered_days_or_visits_count",
+        "pps_operation_outlier_amount",
+        "lifetime_psychiatric_days_count",
+        "claim_drg_amount",
+        "claim_payment_remark_code",
+        "claim_dsh_amount",
+        "claim_msp_pass_thru_amount",
+        "claim_pps_capital_amount",
+        "pps_capital_fsp_drg_amount",
+        "pps_capital_hsp_drg_amount",
+        "pps_capital_dsh_drg_amount",
+        "old_capital_amount",
+        "pps_capital_ime_amount",
+        "pps_oper_hsp_spec_drg_amount",
+        "cost_report_day_count",
+        "pps_oper_fsp_spec_drg_amount",
+        "claim_pps_outlier_amount",
+        "claim_indirect_teaching",
+        "non_pay_prof_comp_amount",
+        "inpatient_claim_payment_remark_code_1",
+        "inpatient_claim_payment_remark_code_2",
+        "inpatient_claim_payment_remark_code_3",
+        "inpatient_claim_payment_remark_code_4",
+        "pps_capital_exception_amount",
+    )
+
+    MOA_KEYS = (
+        "reimbursement_rate",
+        "claim_hcpcs_payable_amount",
+        "outpatient_claim_payment_remark_code_1",
+        "outpatient_claim_payment_remark_code_2",
+        "outpatient_claim_payment_remark_code_3",
+        "outpatient_claim_payment_remark_code_4",
+        "outpatient_claim_payment_remark_code_5",
+        "claim_esrd_payment_amount",
+        "non_payable_professional_comp_amount",
+    )
+
+    NM1_KEYS = (
+        "entity_identifier_code",
+        "entity_type_qualifier",
+        "last_name_or_organization",
+        "first_name",
+        "middle_name",
+        "name_prefix",
+        "name_suffix",
+        "id_code_qualifier",
+        "identifier",
+        "entity_relationship_code",
+    )
+
+    PER_KEYS = (
+        "contact_function_cd",
+        "contact_name",
+        "communication_number_qualifier1",
+        "contact_communication1",
+        "communication_number_qualifier2",
+        "contact_communication2",
+        "communication_number_qualifier3",
+        "contact_communication3",
+        "contact_inquiry_reference",
+    )
+
+    SVC_KEYS = (
+        "prcdr_cd",
+        "chrg_amt",
+        "paid_amt",
+        "rev_cd",
+        "units",
+        "original_prcdr_cd",
+        "original_units_of_service_count",
+    )
+
+    CAS_KEYS = (
+        "adjustment_grp_cd",
+        "adjustment_reason_cd_1",
+        "adjustment_amount_1",
+        "adjustment_quantity_1",
+        "adjustment_reason_cd_2",
+        "adjustment_amount_2",
+        "adjustment_quantity_2",
+        "adjustment_reason_cd_3",
+        "adjustment_amount_3",
+        "adjustment_quantity_3",
+        "adjustment_reason_cd_4",
+        "adjustment_amount_4",
+        "adjustment_quantity_4",
+        "adjustment_reason_cd_5",
+        "adjustment_amount_5",
+        "adjustment_quantity_5",
+        "adjustment_reason_cd_6",
+        "adjustment_amount_6",
+        "adjustment_quantity_6",
+    )
+
+    # shared stand-in for absent segments, so struct builders can skip splitting them
+    _MISSING = Segment.empty()
+
     def __init__(
         self,
         trx_header_loop,
@@ -25,8 +214,11 @@ class Remittance(MedicalClaim):
         self.clm_loop = clm_loop
         self.trx_summary_loop = trx_summary_loop
         self.header_number_loop = header_number_loop
-        self.build()
 
+    #
+    # Populate every section up front. Without this, each section is built
+    # on first access, so callers reading only clm_info skip the rest.
+    #
     def build(self):
         self.trx_header_info = self.populate_trx_loop()
         self.payer_info = self.populate_payer_loop()
@@ -35,126 +227,97 @@ class Remittance(MedicalClaim):
         self.plb_info = self.populate_plb_loop()
         self.header_info = self.populate_header_loop()
 
+    @cached_property
+    def trx_header_info(self):
+        return self.populate_trx_loop()
+
+    @cached_property
+    def payer_info(self):
+        return self.populate_payer_loop()
+
+    @cached_property
+    def payee_info(self):
+        return self.populate_payee_loop()
+
+    @cached_property
+    def clm_info(self):
+        return self.populate_claim_loop()
+
+    @cached_property
+    def plb_info(self):
+        return self.populate_plb_loop()
+
+    @cached_property
+    def header_info(self):
+        return self.populate_header_loop()
+
 
     def populate_header_loop(self):
+        by_name = self._index_segments(self.header_number_loop)
+        lx = self._first_indexed(by_name, "LX")
+        ts3 = self._first_indexed(by_name, "TS3")
+        ts2 = self._first_indexed(by_name, "TS2")
         return {
             # LX elements
-            "assigned_num": self._first(self.header_number_loop, "LX").element(1),
+            "assigned_num": lx.element(1),
             # TS3 elements
-            "ts3": {
-                "provider_identifier": self._first(self.header_number_loop, "TS3").element(1),
-                "facility_code_value": self._first(self.header_number_loop, "TS3").element(2),
-                "fiscal_period_date": self._first(self.header_number_loop, "TS3").element(3),
-                "total_claim_count": self._first(self.header_number_loop, "TS3").element(4),
-                "total_claim_change_amount": self._first(self.header_number_loop, "TS3").element(5),
-                "total_covered_charge_amount": self._first(self.header_number_loop, "TS3").element(6),
-                "total_noncovered_charge_amount": self._first(self.header_number_loop, "TS3").element(7),
-                "total_denied_charge_amount": self._first(self.header_number_loop, "TS3").element(8),
-                "total_provider_amount": self._first(self.header_number_loop, "TS3").element(9),
-                "total_interest_amount": self._first(self.header_number_loop, "TS3").element(10),
-                "total_contractual_adjustment_amount": self._first(self.header_number_loop, "TS3").element(11),
-                "total_gramm_rudman_reduction_amount": self._first(self.header_number_loop, "TS3").element(12),
-                "total_msp_payer_amount": self._first(self.header_number_loop, "TS3").element(13),
-                "total_blood_deductible_amount": self._first(self.header_number_loop, "TS3").element(14),
-                "total_non_lab_charge_amount": self._first(self.header_number_loop, "TS3").element(15),
-                "total_coinsurance_amount": self._first(self.header_number_loop, "TS3").element(16),
-                "total_hcpcs_reported_charge_amount": self._first(self.header_number_loop, "TS3").element(17),
-                "total_hcpcs_payable_amount": self._first(self.header_number_loop, "TS3").element(18),
-                "total_deductible_amount": self._first(self.header_number_loop, "TS3").element(19),
-                "total_professional_component_amount": self._first(self.header_number_loop, "TS3").element(20),
-                "total_msp_patient_liability_met_amount": self._first(self.header_number_loop, "TS3").element(21),
-                "total_patient_reimbursement_amount": self._first(self.header_number_loop, "TS3").element(22),
-                "total_pip_claim_count": self._first(self.header_number_loop, "TS3").element(23),
-                "total_pip_adjustment_amount": self._first(self.header_number_loop, "TS3").element(24),
-            },
+            "ts3": self._seg_to_dict(ts3, self.TS3_KEYS),
             # TS2 elements
-            "ts2": {
-                "total_drg_amount": self._first(self.header_number_loop, "TS2").element(1),
-                "total_federal_specific_amount": self._first(self.header_number_loop, "TS2").element(2),
-                "total_hospital_specific_amount": self._first(self.header_number_loop, "TS2").element(3),
-                "total_disproportionate_amount": self._first(self.header_number_loop, "TS2").element(4),
-                "total_capital_amount": self._first(self.header_number_loop, "TS2").element(5),
-                "total_indirect_medical_education_amount": self._first(self.header_number_loop, "TS2").element(6),
-                "total_outlier_day_count": self._first(self.header_number_loop, "TS2").element(7),
-                "total_day_outlier_amount": self._first(self.header_number_loop, "TS2").element(8),
-                "total_cost_outlier_amount": self._first(self.header_number_loop, "TS2").element(9),
-                "average_drg_length_of_stay": self._first(self.header_number_loop, "TS2").element(10),
-                "total_discharge_count": self._first(self.header_number_loop, "TS2").element(11),
-                "total_cost_report_day_count": self._first(self.header_number_loop, "TS2").element(12),
-                "total_covered_day_count": self._first(self.header_number_loop, "TS2").element(13),
-                "total_noncovered_day_count": self._first(self.header_number_loop, "TS2").element(14),
-                "total_msp_pass_through_amount": self._first(self.header_number_loop, "TS2").element(15),
-                "average_drg_weight": self._first(self.header_number_loop, "TS2").element(16),
-                "total_pps_capital_fsp_drg_amount": self._first(self.header_number_loop, "TS2").element(17),
-                "total_psp_capital_hsp_drg_amount": self._first(self.header_number_loop, "TS2").element(18),
-                "total_pps_dsh_drg_amount": self._first(self.header_number_loop, "TS2").element(19),
-            },
+            "ts2": self._seg_to_dict(ts2, self.TS2_KEYS),
         }
 
 
     def populate_plb_loop(self):
-        return functools.reduce(
-            lambda x, y: x + y,
-            [
-                [
-                    {
-                        'provider_identifier': p.element(1),
-                        'fiscal_period_date': p.element(2),
-                        'provider_adjustment_reason_cd_1': p.element(3, 0) if p.segment_len() > 3 else None,
-                        'provider_adjustment_id_1': p.element(3, 1) if p.segment_len() > 3 else None,
-                        'provider_adjustment_amt_1': p.element(4) if p.segment_len() > 4 else None,
-                        'provider_adjustment_reason_cd_2': p.element(5, 0) if p.segment_len() > 5 else None,
-                        'provider_adjustment_id_2': p.element(5, 1) if p.segment_len() > 5 else None,
-                        'provider_adjustment_amt_2': p.element(6) if p.segment_len() > 6 else None,
-                        'provider_adjustment_reason_cd_3': p.element(7, 0) if p.segment_len() > 7 else None,
-                        'provider_adjustment_id_3': p.element(7, 1) if p.segment_len() > 7 else None,
-                        'provider_adjustment_amt_3': p.element(8) if p.segment_len() > 8 else None,
-                        'provider_adjustment_reason_cd_4': p.element(9, 0) if p.segment_len() > 9 else None,
-                        'provider_adjustment_id_4': p.element(9, 1) if p.segment_len() > 9 else None,
-                        'provider_adjustment_amt_4': p.element(10) if p.segment_len() > 10 else None,
-                        'provider_adjustment_reason_cd_5': p.element(11, 0) if p.segment_len() > 11 else None,
-                        'provider_adjustment_id_5': p.element(11, 1) if p.segment_len() > 11 else None,
-                        'provider_adjustment_amt_5': p.element(12) if p.segment_len() > 12 else None,
-                        'provider_adjustment_reason_cd_6': p.element(13, 0) if p.segment_len() > 13 else None,
-                        'provider_adjustment_id_6': p.element(13, 1) if p.segment_len() > 13 else None,
-                        'provider_adjustment_amt_6': p.element(14) if p.segment_len() > 14 else None,
-                    }
-                    for p in self.segments_by_name("PLB", data=self.trx_summary_loop)
-                ],
-                [],
-            ]
-        )
+        return [self._populate_plb(p) for p in self.segments_by_name("PLB", data=self.trx_summary_loop)]
 
+    def _populate_plb(self, p):
+        n = p.segment_len()
+        return {
+            'provider_identifier': p.element(1),
+            'fiscal_period_date': p.element(2),
+            'provider_adjustment_reason_cd_1': p.element(3, 0) if n > 3 else None,
+            'provider_adjustment_id_1': p.element(3, 1) if n > 3 else None,
+            'provider_adjustment_amt_1': p.element(4) if n > 4 else None,
+            'provider_adjustment_reason_cd_2': p.element(5, 0) if n > 5 else None,
+            'provider_adjustment_id_2': p.element(5, 1) if n > 5 else None,
+            'provider_adjustment_amt_2': p.element(6) if n > 6 else None,
+            'provider_adjustment_reason_cd_3': p.element(7, 0) if n > 7 else None,
+            'provider_adjustment_id_3': p.element(7, 1) if n > 7 else None,
+            'provider_adjustment_amt_3': p.element(8) if n > 8 else None,
+            'provider_adjustment_reason_cd_4': p.element(9, 0) if n > 9 else None,
+            'provider_adjustment_id_4': p.element(9, 1) if n > 9 else None,
+            'provider_adjustment_amt_4': p.element(10) if n > 10 else None,
+            'provider_adjustment_reason_cd_5': p.element(11, 0) if n > 11 else None,
+            'provider_adjustment_id_5': p.element(11, 1) if n > 11 else None,
+            'provider_adjustment_amt_5': p.element(12) if n > 12 else None,
+            'provider_adjustment_reason_cd_6': p.element(13, 0) if n > 13 else None,
+            'provider_adjustment_id_6': p.element(13, 1) if n > 13 else None,
+            'provider_adjustment_amt_6': p.element(14) if n > 14 else None,
+        }
 
 
     def populate_payer_loop(self):
+        by_name = self._index_segments(self.payer_loop)
+        n1 = self._first_indexed(by_name, "N1").elements_slice(0, 6)
+        n3 = self._first_indexed(by_name, "N3").elements_slice(0, 3)
+        n4 = self._first_indexed(by_name, "N4").elements_slice(0, 8)
         return {
-            "entity_identifier_code": self._first(self.payer_loop, "N1").element(1),
-            "payer_name": self._first(self.payer_loop, "N1").element(2),
-            "id_code_qualifier": self._first(self.payer_loop, "N1").element(3),
-            "payer_identifier": self._first(self.payer_loop, "N1").element(4),
-            "entity_relationship_code": self._first(self.payer_loop, "N1").element(5),
-            "payer_address_line_1": self._first(self.payer_loop, "N3").element(1),
-            "payer_address_line_2": self._first(self.payer_loop, "N3").element(2),
-            "payer_city_name": self._first(self.payer_loop, "N4").element(1),
-            "payer_state_code": self._first(self.payer_loop, "N4").element(2),
-            "payer_postal_zone_or_zip_code": self._first(self.payer_loop, "N4").element(3),
-            "country_code": self._first(self.payer_loop, "N4").element(4),
-            "location_qualifier": self._first(self.payer_loop, "N4").element(5),
-            "country_subdivision_code": self._first(self.payer_loop, "N4").element(7),
+            "entity_identifier_code": n1[1],
+            "payer_name": n1[2],
+            "id_code_qualifier": n1[3],
+            "payer_identifier": n1[4],
+            "entity_relationship_code": n1[5],
+            "payer_address_line_1": n3[1],
+            "payer_address_line_2": n3[2],
+            "payer_city_name": n4[1],
+            "payer_state_code": n4[2],
+            "payer_postal_zone_or_zip_code": n4[3],
+            "country_code": n4[4],
+            "location_qualifier": n4[5],
+            "country_subdivision_code": n4[7],
             "payer_contact_info": [
-                {
-                    "contact_function_cd": c.element(1),
-                    "contact_name": c.element(2),
-                    "communication_number_qualifier1": c.element(3),
-                    "contact_communication1": c.element(4),
-                    "communication_number_qualifier2": c.element(5),
-                    "contact_communication2": c.element(6),
-                    "communication_number_qualifier3": c.element(7),
-                    "contact_communication3": c.element(8),
-                    "contact_inquiry_reference": c.element(9),
-                }
-                for c in self.segments_by_name("PER", data=self.payer_loop)
+                self._seg_to_dict(c, self.PER_KEYS)
+                for c in self._indexed_segments(by_name, "PER")
             ],
             "payer_additional_identification": [
                 {
@@ -162,176 +325,92 @@ class Remittance(MedicalClaim):
                     "id": c.element(2),
                     "description": c.element(3),
                 }
-                for c in self.segments_by_name("REF", data=self.payer_loop)
+                for c in self._indexed_segments(by_name, "REF")
             ],
         }
 
     def populate_payee_loop(self):
+        by_name = self._index_segments(self.payee_loop)
+        n1 = self._first_indexed(by_name, "N1").elements_slice(0, 6)
+        n3 = self._first_indexed(by_name, "N3").elements_slice(0, 3)
+        n4 = self._first_indexed(by_name, "N4").elements_slice(0, 8)
+        rdm = self._first_indexed(by_name, "RDM").elements_slice(0, 5)
         return {
-            "entity_identifier_code": self._first(self.payee_loop, "N1").element(1),
-            "payee_name": self._first(self.payee_loop, "N1").element(2),
-            "id_code_qualifier": self._first(self.payee_loop, "N1").element(3),
-            "payee_identifier": self._first(self.payee_loop, "N1").element(4),
-            "entity_relationship_code": self._first(self.payee_loop, "N1").element(5),
-            "payee_address_line_1": self._first(self.payee_loop, "N3").element(1),
-            "payee_address_line_2": self._first(self.payee_loop, "N3").element(2),
-            "payee_city_name": self._first(self.payee_loop, "N4").element(1),
-            "payee_state_code": self._first(self.payee_loop, "N4").element(2),
-            "payee_postal_zone_or_zip_code": self._first(self.payee_loop, "N4").element(3),
-            "country_code": self._first(self.payee_loop, "N4").element(4),
-            "location_qualifier": self._first(self.payee_loop, "N4").element(5),
-            "country_subdivision_code": self._first(self.payee_loop, "N4").element(7),
+            "entity_identifier_code": n1[1],
+            "payee_name": n1[2],
+            "id_code_qualifier": n1[3],
+            "payee_identifier": n1[4],
+            "entity_relationship_code": n1[5],
+            "payee_address_line_1": n3[1],
+            "payee_address_line_2": n3[2],
+            "payee_city_name": n4[1],
+            "payee_state_code": n4[2],
+            "payee_postal_zone_or_zip_code": n4[3],
+            "country_code": n4[4],
+            "location_qualifier": n4[5],
+            "country_subdivision_code": n4[7],
             "payee_additional_identification": [
                 {
                     "id_qualifier_code": c.element(1),
                     "id": c.element(2),
                     "description": c.element(3),
                 }
-                for c in self.segments_by_name("REF", data=self.payee_loop)
+                for c in self._indexed_segments(by_name, "REF")
             ],
-            "delivery_report_transmission_code": self._first(self.payee_loop, "RDM").element(1),
-            "delivery_name": self._first(self.payee_loop, "RDM").element(2),
-            "delivery_communication_number": self._first(self.payee_loop, "RDM").element(3),
-            "delivery_reference_identifier": self._first(self.payee_loop, "RDM").element(4),
+            "delivery_report_transmission_code": rdm[1],
+            "delivery_name": rdm[2],
+            "delivery_communication_number": rdm[3],
+            "delivery_reference_identifier": rdm[4],
         }
 
     def populate_trx_loop(self):
+        by_name = self._index_segments(self.trx_header_loop)
+        dtm = self._first_indexed(by_name, "DTM")
+        bpr = self._first_indexed(by_name, "BPR")
+        trn = self._first_indexed(by_name, "TRN")
         return {
             "dtm": {
-                "date_code": self._first(self.trx_header_loop, "DTM").element(1),
-                "date": self._first(self.trx_header_loop, "DTM").element(2),
-                "time": self._first(self.trx_header_loop, "DTM").element(3),
-            },
-            "bpr": {
-                "transaction_handling_code": self._first(self.trx_header_loop, "BPR").element(1),
-                "total_actual_provider_payment_amt": self._first(self.trx_header_loop, "BPR").element(2),
-                "creditor_debit_flag_code": self._first(self.trx_header_loop, "BPR").element(3),
-                "payment_method_code": self._first(self.trx_header_loop, "BPR").element(4),
-                "payment_format_code": self._first(self.trx_header_loop, "BPR").element(5),
-                "sender_dfiid_number_qualifier": self._first(self.trx_header_loop, "BPR").element(6),
-                "sender_dfi_identifier": self._first(self.trx_header_loop, "BPR").element(7),
-                "sender_account_number_qualifier": self._first(self.trx_header_loop, "BPR").element(8),
-                "sender_bank_acct_number": self._first(self.trx_header_loop, "BPR").element(9),
-                "payer_identifier": self._first(self.trx_header_loop, "BPR").element(10),
-                "payer_originating_co_supplemental_code": self._first(self.trx_header_loop, "BPR").element(11),
-                "receiver_dfiid_number_qualifier": self._first(self.trx_header_loop, "BPR").element(12),
-                "receiver_or_provider_bank_id_number": self._first(self.trx_header_loop, "BPR").element(13),
-                "receiver_acct_number_qualifier": self._first(self.trx_header_loop, "BPR").element(14),
-                "receiver_or_provider_account_number": self._first(self.trx_header_loop, "BPR").element(15),
-                "check_issue_or_eft_effective_date": self._first(self.trx_header_loop, "BPR").element(16),
-                "business_function_code": self._first(self.trx_header_loop, "BPR").element(17), 
+                "date_code": dtm.element(1),
+                "date": dtm.element(2),
+                "time": dtm.element(3),
             },
+            "bpr": self._seg_to_dict(bpr, self.BPR_KEYS),
             "trn": {
-                "trace_type_code": self._first(self.trx_header_loop, "TRN").element(1),
-                "check_or_eft_trace_number": self._first(self.trx_header_loop, "TRN").element(2),
-                "trace_payer_identifier": self._first(self.trx_header_loop, "TRN").element(3),
-                "trace_payer_originating_co_supplemental_code": self._first(self.trx_header_loop, "TRN").element(4),
+                "trace_type_code": trn.element(1),
+                "check_or_eft_trace_number": trn.element(2),
+                "trace_payer_identifier": trn.element(3),
+                "trace_payer_originating_co_supplemental_code": trn.element(4),
             }
         }
 
     def populate_claim_loop(self):
-        end_clp_index = (
-            [
-                i
-                for i, z in enumerate([y.segment_name() for y in self.clm_loop[1:]])
-                if z == "CLP"
-            ]
-            + [len(self.clm_loop)]
-        )[0]
+        by_name = self._clm_index
+        clp = self._first_indexed(by_name, "CLP")
+        nm1 = self._first_indexed(by_name, "NM1")
+        mia = self._first_indexed(by_name, "MIA")
+        moa = self._first_indexed(by_name, "MOA")
+        svc_segments = by_name.get("SVC", [])
+        svc_indices = [i for i, _ in svc_segments]
+        # claim level segments end at the first SVC, or one short of the loop end when there is none
+        pre_svc_idx = svc_indices[0] if svc_indices else len(self.clm_loop) - 1
+        end_clp_index = next((i for i, _ in by_name.get("CLP", ()) if i > 0), len(self.clm_loop))
         return {
-            "clp": {
-                "patient_control_number": self._first(self.clm_loop, "CLP").element(1),
-                "claim_status_code": self._first(self.clm_loop, "CLP").element(2),
-                "total_claim_charge_amount": self._first(self.clm_loop, "CLP").element(3),
-                "claim_payment_amount": self._first(self.clm_loop, "CLP").element(4),
-                "patient_responsibility_amount": self._first(self.clm_loop, "CLP").element(5),
-                "claim_filing_indicator_code": self._first(self.clm_loop, "CLP").element(6),
-                "payer_claim_control_number": self._first(self.clm_loop, "CLP").element(7),
-                "facility_code_value": self._first(self.clm_loop, "CLP").element(8),
-                "claim_frequency_code": self._first(self.clm_loop, "CLP").element(9),
-                "patient_status_code": self._first(self.clm_loop, "CLP").element(10),
-                "drg_code": self._first(self.clm_loop, "CLP").element(11),
-                "drg_weight": self._first(self.clm_loop, "CLP").element(12),
-                "discharge_fraction": self._first(self.clm_loop, "CLP").element(13),
-                "yes_no_condition_or_response_code": self._first(self.clm_loop, "CLP").element(14),
-            },
-            "first_nm1_patient": {
-                "entity_identifier_code": self._first(self.clm_loop, "NM1").element(1),
-                "entity_type_qualifier": self._first(self.clm_loop, "NM1").element(2),
-                "last_name_or_organization": self._first(self.clm_loop, "NM1").element(3),
-                "first_name": self._first(self.clm_loop, "NM1").element(4),
-                "middle_name": self._first(self.clm_loop, "NM1").element(5),
-                "name_prefix": self._first(self.clm_loop, "NM1").element(6),
-                "name_suffix": self._first(self.clm_loop, "NM1").element(7),
-                "id_code_qualifier": self._first(self.clm_loop, "NM1").element(8),
-                "identifier": self._first(self.clm_loop, "NM1").element(9),
-                "entity_relationship_code": self._first(self.clm_loop, "NM1").element(10),
-            },
-            "claim_names": self._populate_names(self.clm_loop[:end_clp_index]),
+            "clp": self._seg_to_dict(clp, self.CLP_KEYS),
+            "first_nm1_patient": self._seg_to_dict(nm1, self.NM1_KEYS),
+            "claim_names": self._populate_names(self._indexed_segments(by_name, "NM1", 0, end_clp_index)),
             "claim_contacts": [
-                {
-                    "contact_function_cd": c.element(1),
-                    "contact_name": c.element(2),
-                    "communication_number_qualifier1": c.element(3),
-                    "contact_communication1": c.element(4),
-                    "communication_number_qualifier2": c.element(5),
-                    "contact_communication2": c.element(6),
-                    "communication_number_qualifier3": c.element(7),
-                    "contact_communication3": c.element(8),
-                    "contact_inquiry_reference": c.element(9),
-                }
-                for c in self.segments_by_name(
-                    "PER",
-                    data=self.clm_loop[: self.index_of_segment(self.clm_loop, "SVC")],
-                )
+                self._seg_to_dict(c, self.PER_KEYS)
+                for c in self._indexed_segments(by_name, "PER", 0, pre_svc_idx)
             ],
-            "mia": {
-                "covered_days_or_visits_count": self._first(self.clm_loop, "MIA").element(1),
-                "pps_operation_outlier_amount": self._first(self.clm_loop, "MIA").element(2),
-                "lifetime_psychiatric_days_count": self._first(self.clm_loop, "MIA").element(3),
-                "claim_drg_amount": self._first(self.clm_loop, "MIA").element(4),
-                "claim_payment_remark_code": self._first(self.clm_loop, "MIA").element(5),
-                "claim_dsh_amount": self._first(self.clm_loop, "MIA").element(6),
-                "claim_msp_pass_thru_amount": self._first(self.clm_loop, "MIA").element(7),
-                "claim_pps_capital_amount": self._first(self.clm_loop, "MIA").element(8),
-                "pps_capital_fsp_drg_amount": self._first(self.clm_loop, "MIA").element(9),
-                "pps_capital_hsp_drg_amount": self._first(self.clm_loop, "MIA").element(10),
-                "pps_capital_dsh_drg_amount": self._first(self.clm_loop, "MIA").element(11),
-                "old_capital_amount": self._first(self.clm_loop, "MIA").element(12),
-                "pps_capital_ime_amount": self._first(self.clm_loop, "MIA").element(13),
-                "pps_oper_hsp_spec_drg_amount": self._first(self.clm_loop, "MIA").element(14),
-                "cost_report_day_count": self._first(self.clm_loop, "MIA").element(15),
-                "pps_oper_fsp_spec_drg_amount": self._first(self.clm_loop, "MIA").element(16),
-                "claim_pps_outlier_amount": self._first(self.clm_loop, "MIA").element(17),
-                "claim_indirect_teaching": self._first(self.clm_loop, "MIA").element(18),
-                "non_pay_prof_comp_amount": self._first(self.clm_loop, "MIA").element(19),
-                "inpatient_claim_payment_remark_code_1": self._first(self.clm_loop, "MIA").element(20),
-                "inpatient_claim_payment_remark_code_2": self._first(self.clm_loop, "MIA").element(21),
-                "inpatient_claim_payment_remark_code_3": self._first(self.clm_loop, "MIA").element(22),
-                "inpatient_claim_payment_remark_code_4": self._first(self.clm_loop, "MIA").element(23),
-                "pps_capital_exception_amount": self._first(self.clm_loop, "MIA").element(24),
-            },
-            "moa": {
-                "reimbursement_rate": self._first(self.clm_loop, "MOA").element(1),
-                "claim_hcpcs_payable_amount": self._first(self.clm_loop, "MOA").element(2),
-                "outpatient_claim_payment_remark_code_1": self._first(self.clm_loop, "MOA").element(3),
-                "outpatient_claim_payment_remark_code_2": self._first(self.clm_loop, "MOA").element(4),
-                "outpatient_claim_payment_remark_code_3": self._first(self.clm_loop, "MOA").element(5),
-                "outpatient_claim_payment_remark_code_4": self._first(self.clm_loop, "MOA").element(6),
-                "outpatient_claim_payment_remark_code_5": self._first(self.clm_loop, "MOA").element(7),
-                "claim_esrd_payment_amount": self._first(self.clm_loop, "MOA").element(8),
-                "non_payable_professional_comp_amount": self._first(self.clm_loop, "MOA").element(9),
-            },
+            "mia": self._seg_to_dict(mia, self.MIA_KEYS),
+            "moa": self._seg_to_dict(moa, self.MOA_KEYS),
             "claim_related_identifications": [
                 {
                     "id_qualifier_code": x.element(1),
                     "id": x.element(2),
                     "description": x.element(3),
                 }
-                for x in self.segments_by_name(
-                    "REF",
-                    data=self.clm_loop[: self.index_of_segment(self.clm_loop, "SVC")],
-                )
+                for x in self._indexed_segments(by_name, "REF", 0, pre_svc_idx)
             ],
             "claim_supplemental_amount": [
                 {
@@ -339,10 +418,7 @@ class Remittance(MedicalClaim):
                     "amt": x.element(2),
                     "credit_debit_flag_code": x.element(3),
                 }
-                for x in self.segments_by_name(
-                    "AMT",
-                    data=self.clm_loop[: self.index_of_segment(self.clm_loop, "SVC")],
-                )
+                for x in self._indexed_segments(by_name, "AMT", 0, pre_svc_idx)
             ],
             "claim_supplemental_quantity": [
                 {
@@ -350,47 +426,16 @@ class Remittance(MedicalClaim):
                     "qty": x.element(2),
                     "composite_unit_of_measure": x.element(3),
                 }
-                for x in self.segments_by_name(
-                    "QTY",
-                    data=self.clm_loop[: self.index_of_segment(self.clm_loop, "SVC")],
-                )
+                for x in self._indexed_segments(by_name, "QTY", 0, pre_svc_idx)
             ],
             # Claim level service adjustments CAS
-            "claim_adjustments": functools.reduce(
-                lambda x, y: x + y,
-                [
-                    self.populate_adjustment_groups(x)
-                    for x in self.segments_by_name(
-                        "CAS",
-                        data=self.clm_loop[
-                            1 : min(
-                                list(
-                                    filter(
-                                        lambda x: x >= 0,
-                                        [
-                                            self.index_of_segment(self.clm_loop, "SVC"),
-                                            len(self.clm_loop) - 1,
-                                        ],
-                                    )
-                                )
-                            )
-                        ],
-                    )
-                ],
-                [],
-            ),
+            "claim_adjustments": [
+                self.populate_adjustment_groups(x)
+                for x in self._indexed_segments(by_name, "CAS", 1, pre_svc_idx)
+            ],
             "claim_lines": [
-                self.populate_claim_line(
-                    seg,
-                    i,
-                    min(
-                        self.index_of_segment(self.clm_loop, "SVC", i + 1),
-                        len(self.clm_loop) - 1,
-                    ),
-                )
-                for i, seg in self.segments_by_name_index(
-                    segment_name="SVC", data=self.clm_loop
-                )
+                self.populate_claim_line(seg, i, svc_end)
+                for (i, seg), svc_end in zip(svc_segments, svc_indices[1:] + [len(self.clm_loop) - 1])
             ],
             "claim_dates": [
                 {
@@ -398,28 +443,52 @@ class Remittance(MedicalClaim):
                     "date": x.element(2),
                     "time": x.element(3),
                 }
-                for x in self.clm_loop
-                if x.segment_name() == "DTM"
+                for x in self._indexed_segments(by_name, "DTM")
             ],
         }
 
-    def _populate_names(self, loop):
-        return [
-            {
-                "entity_identifier_code": x.element(1),
-                "entity_type_qualifier": x.element(2),
-                "last_name_or_organization": x.element(3),
-                "first_name": x.element(4),
-                "middle_name": x.element(5),
-                "name_prefix": x.element(6),
-                "name_suffix": x.element(7),
-                "id_code_qualifier": x.element(8),
-                "identifier": x.element(9),
-                "entity_relationship_code": x.element(10),
-            }
-            for x in loop
-            if x.segment_name() == "NM1"
-        ]
+    #
+    # @returns a dict of keys[i] -> element i + 1 of seg, "" for elements seg does not have
+    #
+    def _seg_to_dict(self, seg, keys):
+        if seg is self._MISSING:
+            return dict.fromkeys(keys, "")
+        return dict(zip(keys, seg.elements_slice(1, len(keys) + 1)))
+
+    #
+    # @returns a dict of segment name -> [(index, segment), ...] built in a single pass over loop
+    #
+    def _index_segments(self, loop):
+        by_name = {}
+        for i, seg in enumerate(loop):
+            by_name.setdefault(seg.segment_name(), []).append((i, seg))
+        return by_name
+
+    #
+    # @returns the segments called name from an _index_segments() map with start <= index < end (all when end is None)
+    #
+    def _indexed_segments(self, by_name, name, start=0, end=None):
+        return [seg for i, seg in by_name.get(name, ()) if start <= i and (end is None or i < end)]
+
+    #
+    # _first() over an _index_segments() map: first segment called name at or after start_index,
+    # or the empty _MISSING segment
+    #
+    def _first_indexed(self, by_name, name, start_index=0):
+        return next((seg for i, seg in by_name.get(name, ()) if i >= start_index), self._MISSING)
+
+    #
+    # clm_loop is read by both the claim and the claim line builders, so index it once
+    #
+    @cached_property
+    def _clm_index(self):
+        return self._index_segments(self.clm_loop)
+
+    #
+    # @param nm1_segments - the NM1 segments to convert
+    #
+    def _populate_names(self, nm1_segments):
+        return [self._seg_to_dict(x, self.NM1_KEYS) for x in nm1_segments]
 
     #
     # @parma svc - the svc segment for the service rendered
@@ -427,20 +496,16 @@ class Remittance(MedicalClaim):
     # @param svc_end_idx - the last segment associated with the service
     #
     def populate_claim_line(self, svc, idx, svc_end_idx):
+        by_name = self._clm_index
+        if svc_end_idx < 0:  # negative ends count from the loop end, as clm_loop[idx:svc_end_idx] did
+            svc_end_idx += len(self.clm_loop)
+        dtm = self._first_indexed(by_name, "DTM", idx).elements_slice(0, 4)
         return {
-            "claim_line_details": {
-                "prcdr_cd": svc.element(1),
-                "chrg_amt": svc.element(2),
-                "paid_amt": svc.element(3),
-                "rev_cd": svc.element(4),
-                "units": svc.element(5),
-                "original_prcdr_cd": svc.element(6),
-                "original_units_of_service_count": svc.element(7),
-            },
+            "claim_line_details": self._seg_to_dict(svc, self.SVC_KEYS),
             "claim_line_dates": {
-                "date_code": self._first(self.clm_loop, "DTM", idx).element(1),
-                "date": self._first(self.clm_loop, "DTM", idx).element(2),
-                "time": self._first(self.clm_loop, "DTM", idx).element(3),
+                "date_code": dtm[1],
+                "date": dtm[2],
+                "time": dtm[3],
             },
             "claim_line_supplemental_amount": [
                 {
@@ -448,9 +513,7 @@ class Remittance(MedicalClaim):
                     "amt": a.element(2),
                     "credit_debit_flag_code": a.element(3),
                 }
-                for a in self.segments_by_name(
-                    "AMT", data=self.clm_loop[idx:svc_end_idx]
-                )
+                for a in self._indexed_segments(by_name, "AMT", idx, svc_end_idx)
             ],
             "claim_line_supplemental_quantity": [
                 {
@@ -458,36 +521,24 @@ class Remittance(MedicalClaim):
                     "qty": a.element(2),
                     "composite_unit_of_measure": a.element(3),
                 }
-                for a in self.segments_by_name(
-                    "AMT", data=self.clm_loop[idx:svc_end_idx]
-                )
+                for a in self._indexed_segments(by_name, "QTY", idx, svc_end_idx)
             ],
             "claim_line_remarks": [
                 {"qualifier_cd": x.element(1), "remark_cd": x.element(2)}
-                for x in self.segments_by_name(
-                    "LQ", data=self.clm_loop[idx:svc_end_idx]
-                )
+                for x in self._indexed_segments(by_name, "LQ", idx, svc_end_idx)
             ],
             # line level service adjustments
-            "claim_line_adjustments": functools.reduce(
-                lambda x, y: x + y,
-                [
-                    self.populate_adjustment_groups(x)
-                    for x in self.segments_by_name(
-                        "CAS", data=self.clm_loop[idx:svc_end_idx]
-                    )
-                ],
-                [],
-            ),
+            "claim_line_adjustments": [
+                self.populate_adjustment_groups(x)
+                for x in self._indexed_segments(by_name, "CAS", idx, svc_end_idx)
+            ],
             "claim_line_related_identifications": [
                 {
                     "id_code_qualifier": x.element(1),
                     "id": x.element(2),
                     "description": x.element(3),
                 }
-                for x in self.segments_by_name(
-                    "REF", data=self.clm_loop[idx:svc_end_idx]
-                )
+                for x in self._indexed_segments(by_name, "REF", idx, svc_end_idx)
             ],
         }
 
@@ -508,37 +559,14 @@ class Remittance(MedicalClaim):
     #     ]
 
     def populate_adjustment_groups(self, cas):
-        group_code = cas.element(1)
-        return [
-            {
-                "adjustment_grp_cd": group_code,
-                "adjustment_reason_cd_1": cas.element(2),
-                "adjustment_amount_1": cas.element(3),
-                "adjustment_quantity_1": cas.element(4),
-                "adjustment_reason_cd_2": cas.element(5),
-                "adjustment_amount_2": cas.element(6),
-                "adjustment_quantity_2": cas.element(7),
-                "adjustment_reason_cd_3": cas.element(8),
-                "adjustment_amount_3": cas.element(9),
-                "adjustment_quantity_3": cas.element(10),
-                "adjustment_reason_cd_4": cas.element(11),
-                "adjustment_amount_4": cas.element(12),
-                "adjustment_quantity_4": cas.element(13),
-                "adjustment_reason_cd_5": cas.element(14),
-                "adjustment_amount_5": cas.element(15),
-                "adjustment_quantity_5": cas.element(16),
-                "adjustment_reason_cd_6": cas.element(17),
-                "adjustment_amount_6": cas.element(18),
-                "adjustment_quantity_6": cas.element(19),
-            }
-        ]
+        return self._seg_to_dict(cas, self.CAS_KEYS)
 
     def to_json(self):
         return {
-            **{"payment": self.trx_header_info},
-            **{"payer": self.payer_info},
-            **{"payee": self.payee_info},
-            **{"claim": self.clm_info},
-            **{"provider_adjustments": self.plb_info},
-            **{"header_info": self.header_info},
+            "payment": self.trx_header_info,
+            "payer": self.payer_info,
+            "payee": self.payee_info,
+            "claim": self.clm_info,
+            "provider_adjustments": self.plb_info,
+            "header_info": self.header_info,
         }
\ No newline at end of file
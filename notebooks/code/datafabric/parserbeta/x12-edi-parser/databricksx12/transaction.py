@@ -1,5 +1,8 @@
 from databricksx12.edi import *
 from databricksx12.format import *
+import sys
+
+_ST_NAME = sys.intern("ST")
 
 # """
 #  Base class for all transactions (ST/SE Segments) 
@@ -42,6 +45,17 @@ from databricksx12.format import *
 
 # ############################################
 class Transaction(EDI):
+    # Built once per ST/SE pair, so keep the per-instance attributes in slots.
+    # EDI itself defines no __slots__, so a __dict__ is still available but never populated here.
+    __slots__ = (
+        'data',
+        'format_cls',
+        'transaction_type',
+        'transaction_set_identifier_code',
+        'transaction_set_control_number',
+        'implementation_convention_reference',
+    )
+
     def __init__(self, segments, delim_cls=AnsiX12Delim, transaction_type=None):
         self.data = segments
         self.format_cls = delim_cls
@@ -55,28 +69,62 @@ class Transaction(EDI):
         # Parse ST segment if available
         self._parse_st_segment()
 
+    @classmethod
+    def from_segment_groups(cls, groups, delim_cls=AnsiX12Delim, transaction_type=None):
+        """
+        Build one Transaction per list of segments, sharing the delimiters and
+        transaction type. Goes through __init__, so every attribute is set the same way
+        """
+        return [cls(segments, delim_cls, transaction_type) for segments in groups]
+
     def _parse_st_segment(self):
-        for segment in self.data:
-            if segment.segment_name() == "ST":
-                self.transaction_set_identifier_code = segment.element(1)
-                self.transaction_set_control_number = segment.element(2)
-                self.implementation_convention_reference = segment.element(3)
-                break
+        # Transactions normally start with ST; only scan when they do not
+        if self.data and self.data[0].segment_name() == _ST_NAME:
+            segment = self.data[0]
+        else:
+            segment = next((s for s in self.data if s.segment_name() == _ST_NAME), None)
+        if segment is not None:
+            # one split of the ST segment for all three fields
+            (
+                self.transaction_set_identifier_code,
+                self.transaction_set_control_number,
+                self.implementation_convention_reference,
+            ) = segment.elements_slice(1, 4)
 
     def __getstate__(self):
-        return {
-            'data': self.data,
-            'format_cls': self.format_cls,
-            'transaction_type': self.transaction_type,
-            'transaction_set_identifier_code': self.transaction_set_identifier_code,
-            'transaction_set_control_number': self.transaction_set_control_number,
-            'implementation_convention_reference': self.implementation_convention_reference
-        }
+        """
+        Return state values to be pickled, as a tuple in __slots__ order.
+        Called by pickle.dumps() and cloudpickle.dumps()
+        """
+        return (
+            self.data,
+            self.format_cls,
+            self.transaction_type,
+            self.transaction_set_identifier_code,
+            self.transaction_set_control_number,
+            self.implementation_convention_reference,
+        )
 
     def __setstate__(self, state):
-        self.data = state['data']
-        self.format_cls = state['format_cls']
-        self.transaction_type = state['transaction_type']
-        self.transaction_set_identifier_code = state.get('transaction_set_identifier_code')
-        self.transaction_set_control_number = state.get('transaction_set_control_number')
-        self.implementation_convention_reference = state.get('implementation_convention_reference')
+        """
+        Restore state from the unpickled state values.
+        Called by pickle.loads() and cloudpickle.loads()
+        """
+        if isinstance(state, dict):
+            # pickled by an older version, which stored a dict
+            state = (
+                state['data'],
+                state['format_cls'],
+                state['transaction_type'],
+                state.get('transaction_set_identifier_code'),
+                state.get('transaction_set_control_number'),
+                state.get('implementation_convention_reference'),
+            )
+        (
+            self.data,
+            self.format_cls,
+            self.transaction_type,
+            self.transaction_set_identifier_code,
+            self.transaction_set_control_number,
+            self.implementation_convention_reference,
+        ) = state
@@ -32,7 +32,15 @@ class TestClaims(PysparkBaseTest):
         edi = EDI(open("sampledata/835/no_plb_sample.txt", "rb").read().decode("utf-8"))
         data = hm.from_edi(edi)[0]
         assert(len(data.to_json()['provider_adjustments']) == 0)
-        
+
+    def test_835_claim_line_quantity(self):
+        clm_loop = [Segment(x) for x in ["CLP*1*1*100*80", "SVC*HC:99213*100*80", "AMT*B6*80", "QTY*ZK*2", "SE*5*0001"]]
+        data = Remittance([], [], [], clm_loop, [], [])
+        line = data.to_json()['claim']['claim_lines'][0]
+        assert([x.get("amt_qualifier_cd") for x in line['claim_line_supplemental_amount']] == ['B6'])
+        assert([x.get("quantity_qualifier") for x in line['claim_line_supplemental_quantity']] == ['ZK'])
+        assert([x.get("qty") for x in line['claim_line_supplemental_quantity']] == ['2'])
+
 
 if __name__ == '__main__':
     unittest.main()        
@@ -28,5 +28,12 @@ class TestSegment(PysparkBaseTest):
         assert ( TestSegment.segments[22].element(5, 0) + ":" + TestSegment.segments[22].element(5, 1) + ":" +  TestSegment.segments[22].element(5, 2) == '11:A:1' )
         assert ( TestSegment.segments[22].element(5, 3) == "" )
 
+    def test_elements_slice(self):
+        segment = TestSegment.segments[22]
+        assert ( segment.elements_slice(1, 6) == [segment.element(i) for i in range(1, 6)] )
+        n = segment.segment_len()
+        assert ( segment.elements_slice(n - 1, n + 2) == [segment.element(n - 1), "", ""] )
+        assert ( segment.elements_slice(n, n + 2, dne=None) == [None, None] )
+
 if __name__ == '__main__':
     unittest.main()
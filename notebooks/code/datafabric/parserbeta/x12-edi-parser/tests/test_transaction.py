@@ -0,0 +1,32 @@
+import unittest
+from ember.edi import EDI, Segment
+from ember.format import *
+from ember.transaction import Transaction
+
+
+class TestTransaction(unittest.TestCase):
+
+    edi = EDI(open("sampledata/837/CHPW_Claimdata.txt", "rb").read().decode("utf-8"))
+
+    #
+    # Bulk construction must set every slot exactly as __init__ does
+    #
+    def test_from_segment_groups_matches_init(self):
+        groups = [t.data for fg in TestTransaction.edi.functional_segments() for t in fg.transaction_segments()]
+        # ST not first: found by scanning; no ST at all: fields stay None
+        groups.append([Segment("BHT*0019*00*0123*20230101*1200*CH"), Segment("ST*837*0002*005010X222A1"), Segment("SE*3*0002")])
+        groups.append([Segment("BHT*0019*00*0123*20230101*1200*CH"), Segment("SE*2*0003")])
+        groups.append([])
+
+        bulk = Transaction.from_segment_groups(groups, AnsiX12Delim, "837")
+        single = [Transaction(g, AnsiX12Delim, "837") for g in groups]
+        assert(len(bulk) == len(single) == len(groups))
+        for b, s in zip(bulk, single):
+            for field in Transaction.__slots__:
+                assert(getattr(b, field) == getattr(s, field)), field
+        assert([t.transaction_set_control_number for t in bulk[-3:]] == ['0002', None, None])
+        assert(bulk[-3].implementation_convention_reference == '005010X222A1')
+
+
+if __name__ == '__main__':
+    unittest.main()
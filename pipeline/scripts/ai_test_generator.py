@@ -4,50 +4,200 @@ Uses Azure OpenAI to analyze notebook code patterns and generate pytest/unittest
 """
 
 import os
+import re
 import json
-import glob
-import argparse
+import mmap
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Union
+
+# openai and httpx are imported when a generator is created, keeping --help and import fast
+if TYPE_CHECKING:
+    import httpx
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib parser
+    orjson = None
+
+# Patterns used on every notebook cell, compiled once at import
+_FUNC_RE = re.compile(r'def\s+(\w+)\s*\([^)]*\).*?(?=\ndef\s|\nclass\s|\Z)', re.DOTALL)
+_FULL_FUNC_RE = re.compile(r'(def\s+\w+\s*\([^)]*\):.*?)(?=\ndef\s|\nclass\s|\Z)', re.DOTALL)
+_TABLE_RE = re.compile(r"(?:FROM|INTO|TABLE)\s+['\"]?(\w+\.?\w+)['\"]?", re.IGNORECASE)
+_VSCODE_CELL_RE = re.compile(r'<VSCode\.Cell[^>]*language="python"[^>]*>(.*?)</VSCode\.Cell>', re.DOTALL)
+_PATTERN_RE = re.compile(
+    r'(?P<spark_operations>spark\.(?:read|sql))'
+    r'|(?P<schema_definitions>Struct(?:Type|Field))'
+    r'|(?P<data_transformations>\.(?:filter|select|groupBy|agg|join)\()'
+)
+# characters of each cell kept as the sample for a detected pattern
+_PATTERN_SNIPPET = {'spark_operations': 200, 'schema_definitions': 300, 'data_transformations': 200}
+_JSON_START_RE = re.compile(rb'\s*\{')
+# Parse VSCode XML-style notebooks with _VSCODE_CELL_RE instead of the find scanner
+USE_REGEX_FALLBACK = False
+# Notebooks larger than this (typically from embedded image outputs) are memory-mapped, not read
+MMAP_THRESHOLD_BYTES = 1_000_000
+
+# Hard upper bound on prompt length; Azure OpenAI latency and cost grow with input tokens
+MAX_PROMPT_CHARS = 8000
+
+_PROMPT_INSTRUCTIONS = """Generate a complete pytest test file that includes:
 
-# Azure OpenAI imports
-from openai import AzureOpenAI
+1. **Fixtures**:
+   - Mock SparkSession fixture
+   - Sample DataFrame fixtures based on detected schemas
+   - Mock dbutils fixture for Databricks widgets
+   - Configuration fixtures
+
+2. **Unit Tests**:
+   - Test each function found in the notebook
+   - Include positive and negative test cases
+   - Test edge cases (empty DataFrames, null values, etc.)
+
+3. **Data Quality Tests**:
+   - Schema validation tests
+   - Null check assertions
+   - Data type validation
+   - Business rule validations based on the code logic
+
+4. **Integration Test Stubs**:
+   - Table existence checks
+   - Data freshness tests
+
+Use these best practices:
+- Use pytest parametrize for multiple test cases
+- Include docstrings explaining each test
+- Use meaningful assertion messages
+- Mock external dependencies (dbutils, spark.sql)
+
+Return ONLY the Python code for the test file, no explanations.
+"""
+
+
+def _load_json(raw: Union[bytes, mmap.mmap]) -> Any:
+    """Parse JSON bytes (or a memory-mapped file) with orjson when available, else the stdlib parser."""
+    if orjson is not None:
+        try:
+            # orjson reads a memoryview without copying it into a bytes object
+            with memoryview(raw) as view:
+                return orjson.loads(view)
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN/Infinity, which Jupyter output JSON may contain
+            pass
+    return json.loads(bytes(raw))
+
+
+def _dump_json(obj: Any) -> bytes:
+    """Serialize to indented JSON bytes with orjson when available, else the stdlib encoder."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
+
+def _decode_text(raw: bytes) -> str:
+    """Decode UTF-8 notebook text with universal newlines, as a file opened in text mode reads it."""
+    return raw.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+
+
+def _vscode_python_cells(content: Union[bytes, mmap.mmap]) -> List[str]:
+    """
+    Return the source of each python cell in a VSCode XML-style notebook.
+    Same result as _VSCODE_CELL_RE.findall() on the decoded text, but only the opening tags are
+    inspected, so large non-python cells and outputs are skipped with find instead of regex scanning.
+    Works on the raw UTF-8 bytes; only the python cells are decoded, with line endings normalized.
+    """
+    cells = []
+    pos = content.find(b'<VSCode.Cell')
+    while pos >= 0:
+        tag_end = content.find(b'>', pos)
+        if tag_end < 0:
+            break
+        if content.find(b'language="python"', pos, tag_end) >= 0:
+            end = content.find(b'</VSCode.Cell>', tag_end + 1)
+            if end < 0:
+                break
+            cells.append(_decode_text(content[tag_end + 1:end]))
+            pos = end + len(b'</VSCode.Cell>')
+        else:
+            pos = tag_end
+        pos = content.find(b'<VSCode.Cell', pos)
+    return cells
 
 
 class NotebookTestGenerator:
     """Generates tests for Databricks notebooks using Azure OpenAI."""
 
-    def __init__(self, azure_endpoint: str, api_key: str, api_version: str = "2024-02-15-preview"):
+    def __init__(self, azure_endpoint: str, api_key: str, api_version: str = "2024-02-15-preview",
+                 cache_dir: Optional[str] = None):
+        from openai import AzureOpenAI
+
         self.client = AzureOpenAI(
             azure_endpoint=azure_endpoint,
             api_key=api_key,
-            api_version=api_version
+            api_version=api_version,
+            http_client=self._create_http_client()
         )
         self.deployment_name = os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4")
+        # Reuse earlier responses for identical prompts, stored under cache_dir (None disables it).
+        # Kept out of the output dir, which is published as the test artifact.
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def _create_http_client() -> "httpx.Client":
+        """Pooled client shared by all worker threads, multiplexed over HTTP/2 when h2 is installed."""
+        import httpx
+
+        options = dict(
+            # Same request timeout as the openai default; long generations can take minutes
+            timeout=httpx.Timeout(600.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        )
+        try:
+            return httpx.Client(http2=True, **options)
+        except ImportError:  # httpx[http2] extra (h2) not installed
+            return httpx.Client(**options)
+
+    def _cache_path(self, prompt: str) -> str:
+        """Location of the cached test code for a prompt sent to the current deployment."""
+        key = hashlib.blake2b(f"{self.deployment_name}\0{prompt}".encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.py")
+
+    @staticmethod
+    def _test_output_path(notebook_path: str, output_dir: str) -> str:
+        """Location of the generated test file for a notebook."""
+        return os.path.join(output_dir, f"test_{Path(notebook_path).stem}.py")
 
     def parse_notebook(self, notebook_path: str) -> Dict[str, Any]:
         """Parse a Jupyter notebook and extract code cells."""
-        with open(notebook_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
+        with open(notebook_path, 'rb') as f:
+            if os.path.getsize(notebook_path) > MMAP_THRESHOLD_BYTES:
+                # Let the OS page the file in on demand instead of copying it onto the heap
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return self._parse_notebook_content(mm, notebook_path)
+            raw = f.read()
+        return self._parse_notebook_content(raw, notebook_path)
+
+    def _parse_notebook_content(self, raw: Union[bytes, mmap.mmap], notebook_path: str) -> Dict[str, Any]:
+        """Extract code cells from the raw notebook file contents."""
         # Handle both JSON and VSCode XML-style notebooks
-        if content.strip().startswith('{'):
-            notebook = json.loads(content)
-            cells = []
-            for cell in notebook.get('cells', []):
-                if cell.get('cell_type') == 'code':
-                    source = ''.join(cell.get('source', []))
-                    cells.append({
-                        'type': 'code',
-                        'source': source
-                    })
+        if _JSON_START_RE.match(raw):
+            # Parse the bytes directly; only code cells are kept, outputs are never touched
+            notebook = _load_json(raw)
+            cells = [
+                {'type': 'code', 'source': ''.join(cell.get('source', []))}
+                for cell in notebook.get('cells', [])
+                if cell.get('cell_type') == 'code'
+            ]
             return {'cells': cells, 'path': notebook_path}
         else:
             # VSCode XML-style format
-            import re
             cells = []
-            pattern = r'<VSCode\.Cell[^>]*language="python"[^>]*>(.*?)</VSCode\.Cell>'
-            matches = re.findall(pattern, content, re.DOTALL)
+            if USE_REGEX_FALLBACK:
+                matches = _VSCODE_CELL_RE.findall(_decode_text(bytes(raw)))
+            else:
+                matches = _vscode_python_cells(raw)
             for match in matches:
                 cells.append({
                     'type': 'code',
@@ -57,18 +207,15 @@ class NotebookTestGenerator:
 
     def extract_functions(self, notebook_data: Dict[str, Any]) -> List[Dict[str, str]]:
         """Extract function definitions from notebook cells."""
-        import re
         functions = []
         
         for cell in notebook_data.get('cells', []):
             source = cell.get('source', '')
             # Find function definitions
-            func_pattern = r'def\s+(\w+)\s*\([^)]*\).*?(?=\ndef\s|\nclass\s|\Z)'
-            matches = re.findall(func_pattern, source, re.DOTALL)
+            matches = _FUNC_RE.findall(source)
             
             # Also extract full function with body
-            full_func_pattern = r'(def\s+\w+\s*\([^)]*\):.*?)(?=\ndef\s|\nclass\s|\Z)'
-            full_matches = re.findall(full_func_pattern, source, re.DOTALL)
+            full_matches = _FULL_FUNC_RE.findall(source)
             
             for i, name in enumerate(matches):
                 functions.append({
@@ -88,44 +235,44 @@ class NotebookTestGenerator:
             'data_transformations': []
         }
         
-        import re
+        table_references = set()
         for cell in notebook_data.get('cells', []):
             source = cell.get('source', '')
             
-            # Find Spark DataFrame operations
-            if 'spark.read' in source or 'spark.sql' in source:
-                patterns['spark_operations'].append(source[:200])
+            # One pass finds which of the Spark read/sql, schema and transformation patterns occur
+            kinds = set()
+            for match in _PATTERN_RE.finditer(source):
+                kinds.add(match.lastgroup)
+                if len(kinds) == len(_PATTERN_SNIPPET):
+                    break
+            for kind, limit in _PATTERN_SNIPPET.items():
+                if kind in kinds:
+                    patterns[kind].append(source[:limit])
             
             # Find table references
-            table_pattern = r"(?:FROM|INTO|TABLE)\s+['\"]?(\w+\.?\w+)['\"]?"
-            tables = re.findall(table_pattern, source, re.IGNORECASE)
-            patterns['table_references'].extend(tables)
-            
-            # Find schema definitions
-            if 'StructType' in source or 'StructField' in source:
-                patterns['schema_definitions'].append(source[:300])
-            
-            # Find transformations
-            if any(t in source for t in ['.filter(', '.select(', '.groupBy(', '.agg(', '.join(']):
-                patterns['data_transformations'].append(source[:200])
+            table_references.update(_TABLE_RE.findall(source))
         
-        # Remove duplicates
-        patterns['table_references'] = list(set(patterns['table_references']))
+        # Remove duplicates; sorted so the prompt, and its cache key, are the same on every run
+        patterns['table_references'] = sorted(table_references)
         
         return patterns
 
-    def generate_tests(self, notebook_path: str, output_dir: str) -> str:
-        """Generate test cases for a notebook using Azure OpenAI."""
-        
-        # Parse notebook
-        notebook_data = self.parse_notebook(notebook_path)
-        functions = self.extract_functions(notebook_data)
-        patterns = self.analyze_data_patterns(notebook_data)
-        
-        # Build context for AI
+    def _build_prompt(self, notebook_path: str, notebook_data: Dict[str, Any],
+                      functions: List[Dict[str, str]], patterns: Dict[str, Any]) -> str:
+        """
+        Build the generation prompt, at most MAX_PROMPT_CHARS long. The sample code gives way
+        first, then functions are dropped from the end; only an oversized path or table list
+        gets the header itself cut.
+        """
         notebook_name = Path(notebook_path).stem
         
-        prompt = f"""You are an expert Python test engineer specializing in Databricks and PySpark testing.
+        # Function code is cut to 500 chars each and dumped compactly; the LLM does not need indentation
+        fn_summaries = [{'name': f['name'], 'code': f['code'][:500]} for f in functions[:10]]
+        sample_code = chr(10).join([c['source'][:400] for c in notebook_data['cells'][:5]])
+        
+        budget = MAX_PROMPT_CHARS - len(_PROMPT_INSTRUCTIONS) - 2
+        for count in range(len(fn_summaries), -1, -1):
+            head = f"""You are an expert Python test engineer specializing in Databricks and PySpark testing.
 
 Analyze the following notebook code and generate comprehensive pytest test cases.
 
@@ -133,7 +280,7 @@ NOTEBOOK: {notebook_name}
 PATH: {notebook_path}
 
 FUNCTIONS FOUND:
-{json.dumps([{'name': f['name'], 'code': f['code'][:500]} for f in functions[:10]], indent=2)}
+{json.dumps(fn_summaries[:count], separators=(',', ':'))}
 
 DATA PATTERNS DETECTED:
 - Spark Operations: {len(patterns['spark_operations'])} found
@@ -142,63 +289,61 @@ DATA PATTERNS DETECTED:
 - Data Transformations: {len(patterns['data_transformations'])} found
 
 SAMPLE CODE FROM NOTEBOOK:
-{chr(10).join([c['source'][:400] for c in notebook_data['cells'][:5]])}
-
-Generate a complete pytest test file that includes:
-
-1. **Fixtures**:
-   - Mock SparkSession fixture
-   - Sample DataFrame fixtures based on detected schemas
-   - Mock dbutils fixture for Databricks widgets
-   - Configuration fixtures
-
-2. **Unit Tests**:
-   - Test each function found in the notebook
-   - Include positive and negative test cases
-   - Test edge cases (empty DataFrames, null values, etc.)
-
-3. **Data Quality Tests**:
-   - Schema validation tests
-   - Null check assertions
-   - Data type validation
-   - Business rule validations based on the code logic
-
-4. **Integration Test Stubs**:
-   - Table existence checks
-   - Data freshness tests
-
-Use these best practices:
-- Use pytest parametrize for multiple test cases
-- Include docstrings explaining each test
-- Use meaningful assertion messages
-- Mock external dependencies (dbutils, spark.sql)
-
-Return ONLY the Python code for the test file, no explanations.
 """
+            if len(head) <= budget:
+                break
+        head = head[:budget]
 
-        response = self.client.chat.completions.create(
-            model=self.deployment_name,
-            messages=[
-                {"role": "system", "content": "You are an expert Python test engineer. Generate only valid Python pytest code."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=4000
-        )
+        room = budget - len(head)
+        if len(sample_code) > room:
+            sample_code = sample_code[:room - 3] + '...' if room >= 3 else ''
+        return f"{head}{sample_code}\n\n{_PROMPT_INSTRUCTIONS}"
+
+    def generate_tests(self, notebook_path: str, output_dir: str) -> str:
+        """Generate test cases for a notebook using Azure OpenAI."""
         
-        test_code = response.choices[0].message.content
+        # Parse notebook
+        notebook_data = self.parse_notebook(notebook_path)
+        functions = self.extract_functions(notebook_data)
+        patterns = self.analyze_data_patterns(notebook_data)
         
-        # Clean up code block markers if present
-        if test_code.startswith('```python'):
-            test_code = test_code[9:]
-        if test_code.startswith('```'):
-            test_code = test_code[3:]
-        if test_code.endswith('```'):
-            test_code = test_code[:-3]
+        prompt = self._build_prompt(notebook_path, notebook_data, functions, patterns)
+
+        cache_path = self._cache_path(prompt) if self.cache_dir else None
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                test_code = f.read()
+        else:
+            response = self.client.chat.completions.create(
+                model=self.deployment_name,
+                messages=[
+                    {"role": "system", "content": "You are an expert Python test engineer. Generate only valid Python pytest code."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                max_tokens=4000
+            )
+            
+            test_code = response.choices[0].message.content
+            
+            # Clean up code block markers if present
+            if test_code.startswith('```python'):
+                test_code = test_code[9:]
+            if test_code.startswith('```'):
+                test_code = test_code[3:]
+            if test_code.endswith('```'):
+                test_code = test_code[:-3]
+            
+            if cache_path:
+                # Write then rename, so a concurrent worker never reads a partial entry
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=os.path.dirname(cache_path),
+                                                 suffix='.tmp', delete=False) as f:
+                    f.write(test_code)
+                os.replace(f.name, cache_path)
         
         # Write test file
-        test_filename = f"test_{notebook_name}.py"
-        output_path = os.path.join(output_dir, test_filename)
+        output_path = self._test_output_path(notebook_path, output_dir)
         
         os.makedirs(output_dir, exist_ok=True)
         with open(output_path, 'w', encoding='utf-8') as f:
@@ -239,18 +384,84 @@ Return only Python code with these functions.
 
 def discover_notebooks(base_path: str, pattern: str = "**/*.ipynb") -> List[str]:
     """Discover all notebooks in the given path."""
-    notebooks = glob.glob(os.path.join(base_path, pattern), recursive=True)
-    # Exclude test notebooks
-    return [nb for nb in notebooks if 'test' not in nb.lower() and 'unittest' not in nb.lower()]
+    base = Path(base_path)
+    notebooks = []
+    # Path.glob walks the tree lazily; each path is filtered as it is found
+    for path in base.glob(pattern):
+        # Skip hidden directories such as .ipynb_checkpoints, as glob.glob does
+        if any(part.startswith('.') for part in path.relative_to(base).parts):
+            continue
+        nb = str(path)
+        # Exclude test notebooks ('unittest' is covered by 'test')
+        if 'test' not in nb.lower():
+            notebooks.append(nb)
+    # glob order depends on the filesystem; sort so runs and manifests are reproducible
+    return sorted(notebooks)
+
+
+def _default_cache_dir() -> str:
+    """Per-user cache location ($XDG_CACHE_HOME or ~/.cache), outside the published test output."""
+    base = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ai-test-generator')
+
+
+def _notebook_digest(notebook_path: str) -> Optional[bytes]:
+    """Content hash of a notebook file, or None if it cannot be read."""
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(notebook_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.digest()
+
+
+def _batch_by_output_path(groups: List[List[int]], output_paths: List[str]) -> List[List[List[int]]]:
+    """
+    Merge groups of notebook indices whose notebooks write the same output path into one batch,
+    so notebooks sharing a test file name run one after another instead of racing on the file.
+    Batches and the groups within them keep the order of `groups`.
+    """
+    parent = list(range(len(groups)))
+
+    def find(group: int) -> int:
+        while parent[group] != group:
+            parent[group] = parent[parent[group]]
+            group = parent[group]
+        return group
+
+    owner: Dict[str, int] = {}
+    for group, indices in enumerate(groups):
+        for idx in indices:
+            first = owner.setdefault(output_paths[idx], group)
+            root, other = find(group), find(first)
+            if root != other:
+                # the earlier group stays the root, so batches keep the order of `groups`
+                parent[max(root, other)] = min(root, other)
+
+    batches: Dict[int, List[List[int]]] = {}
+    for group, indices in enumerate(groups):
+        batches.setdefault(find(group), []).append(indices)
+    return list(batches.values())
 
 
 def main():
+    import argparse
+
     parser = argparse.ArgumentParser(description='Generate AI-powered tests for Databricks notebooks')
     parser.add_argument('--notebooks-path', required=True, help='Path to notebooks directory')
     parser.add_argument('--output-dir', required=True, help='Output directory for generated tests')
     parser.add_argument('--pattern', default='**/*.ipynb', help='Glob pattern for notebook discovery')
     parser.add_argument('--azure-endpoint', help='Azure OpenAI endpoint (or set AZURE_OPENAI_ENDPOINT env var)')
     parser.add_argument('--single-notebook', help='Generate tests for a single notebook only')
+    parser.add_argument('--cache-dir', default=_default_cache_dir(),
+                        help='Directory of cached Azure OpenAI responses, reused for identical prompts '
+                             '(default: %(default)s; keep it outside --output-dir, which is published)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always call Azure OpenAI instead of reusing cached responses')
+    parser.add_argument('--max-workers', type=int, default=8,
+                        help='Notebooks processed concurrently (each waits on an Azure OpenAI call)')
     
     args = parser.parse_args()
     
@@ -264,7 +475,7 @@ def main():
         exit(1)
     
     # Initialize generator
-    generator = NotebookTestGenerator(azure_endpoint, api_key)
+    generator = NotebookTestGenerator(azure_endpoint, api_key, cache_dir=None if args.no_cache else args.cache_dir)
     
     # Find notebooks
     if args.single_notebook:
@@ -274,15 +485,46 @@ def main():
     
     print(f"Found {len(notebooks)} notebooks to process")
     
-    # Generate tests
-    generated_tests = []
-    for notebook in notebooks:
-        try:
-            print(f"\nProcessing: {notebook}")
-            test_path = generator.generate_tests(notebook, args.output_dir)
-            generated_tests.append(test_path)
-        except Exception as e:
-            print(f"ERROR processing {notebook}: {e}")
+    def process(group: List[str]) -> List[str]:
+        # The notebooks of a group are byte-identical and write the same test file; generate it once,
+        # for the last one, which is the notebook whose test that file holds after a sequential run
+        notebook = group[-1]
+        print(f"\nProcessing: {notebook}")
+        test_path = generator.generate_tests(notebook, args.output_dir)
+        for sibling in group[:-1]:
+            print(f"Generated: {test_path} (same content as {sibling})")
+        return [test_path] * len(group)
+
+    def process_batch(batch: List[List[int]]) -> Dict[int, str]:
+        # Groups of a batch share output paths, so they run one after another, in the order of
+        # their last notebook; the file is left holding the test of the last notebook writing it
+        results = {}
+        for indices in sorted(batch, key=lambda indices: indices[-1]):
+            try:
+                results.update(zip(indices, process([notebooks[idx] for idx in indices])))
+            except Exception as e:
+                print(f"ERROR processing {notebooks[indices[-1]]}: {e}")
+        return results
+
+    # Generate tests; the calls are network bound, so threads share the one generator and its client
+    # Results are stored by notebook position, so the manifest follows input order, not completion order
+    generated_tests: List[Optional[str]] = [None] * len(notebooks)
+    with ThreadPoolExecutor(max_workers=max(1, args.max_workers)) as executor:
+        # Group byte-identical notebooks (copies across environments) that also write the same
+        # test file, so each costs one Azure OpenAI call. Copies under another name get their own
+        # prompt, which names them. Unreadable files stay on their own.
+        output_paths = [generator._test_output_path(notebook, args.output_dir) for notebook in notebooks]
+        groups: Dict[Any, List[int]] = {}
+        for idx, digest in enumerate(executor.map(_notebook_digest, notebooks)):
+            groups.setdefault((digest, output_paths[idx]) if digest else notebooks[idx], []).append(idx)
+        batches = _batch_by_output_path(list(groups.values()), output_paths)
+
+        futures = [executor.submit(process_batch, batch) for batch in batches]
+        for future in as_completed(futures):
+            for idx, test_path in future.result().items():
+                generated_tests[idx] = test_path
+    # Drop notebooks whose generation failed; notebooks sharing a test file name list it once
+    generated_tests = list(dict.fromkeys(test_path for test_path in generated_tests if test_path is not None))
     
     # Summary
     print(f"\n{'='*50}")
@@ -290,13 +532,14 @@ def main():
     print(f"Output directory: {args.output_dir}")
     
     # Write manifest
+    os.makedirs(args.output_dir, exist_ok=True)
     manifest_path = os.path.join(args.output_dir, 'generated_tests_manifest.json')
-    with open(manifest_path, 'w') as f:
-        json.dump({
+    with open(manifest_path, 'wb') as f:
+        f.write(_dump_json({
             'generated_at': str(Path(__file__).stat().st_mtime),
             'notebooks_processed': len(notebooks),
             'tests_generated': generated_tests
-        }, f, indent=2)
+        }))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,121 @@
+import io, os, sys, json, time, random, tempfile, unittest, contextlib
+from unittest import mock
+# ai_test_generator.py is a script next to this file, not part of a package
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import ai_test_generator as gen
+
+
+class TestVSCodeCells(unittest.TestCase):
+
+    #
+    # The find scanner must return what _VSCODE_CELL_RE.findall returned on the text-mode read
+    #
+    def assert_same_as_regex(self, content: str):
+        text = io.TextIOWrapper(io.BytesIO(content.encode('utf-8')), encoding='utf-8').read()
+        self.assertEqual(gen._vscode_python_cells(content.encode('utf-8')), gen._VSCODE_CELL_RE.findall(text))
+
+    def test_python_and_markdown_cells(self):
+        content = ('<VSCode.Cell id="1" language="markdown">\n# Title\n</VSCode.Cell>\n'
+                   '<VSCode.Cell id="2" language="python">\nx = 1\n</VSCode.Cell>\n'
+                   '<VSCode.Cell language="python">print("é")</VSCode.Cell>')
+        self.assert_same_as_regex(content)
+        self.assertEqual(gen._vscode_python_cells(content.encode('utf-8')), ['\nx = 1\n', 'print("é")'])
+
+    def test_crlf_line_endings(self):
+        content = '<VSCode.Cell language="python">\r\nx = 1\r\ny = 2\r\n</VSCode.Cell>\r\n'
+        self.assert_same_as_regex(content)
+        self.assertEqual(gen._vscode_python_cells(content.encode('utf-8')), ['\nx = 1\ny = 2\n'])
+
+    def test_unclosed_and_empty_cells(self):
+        for content in ['<VSCode.Cell language="python"></VSCode.Cell>',
+                        '<VSCode.Cell language="python">x = 1',
+                        '<VSCode.Cell language="python">x = 1</VSCode.Cell><VSCode.Cell language="python">y',
+                        '<VSCode.Cell language="python"',
+                        '<VSCode.Cell language="markdown">a <VSCode.Cell language="python">b</VSCode.Cell>',
+                        '']:
+            self.assert_same_as_regex(content)
+
+    def test_regex_fallback_flag(self):
+        generator = gen.NotebookTestGenerator.__new__(gen.NotebookTestGenerator)
+        raw = b'<VSCode.Cell language="python">\r\nx = 1\r\n</VSCode.Cell>'
+        cells = generator._parse_notebook_content(raw, 'nb.ipynb')['cells']
+        gen.USE_REGEX_FALLBACK = True
+        try:
+            self.assertEqual(generator._parse_notebook_content(raw, 'nb.ipynb')['cells'], cells)
+        finally:
+            gen.USE_REGEX_FALLBACK = False
+
+
+class TestBatching(unittest.TestCase):
+
+    #
+    # Groups writing the same output path must end up in one batch, in group order
+    #
+    def test_separate_paths(self):
+        self.assertEqual(gen._batch_by_output_path([[0], [1], [2]], ['a', 'b', 'c']), [[[0]], [[1]], [[2]]])
+
+    def test_same_stem_notebooks(self):
+        self.assertEqual(gen._batch_by_output_path([[0], [1], [2]], ['a', 'b', 'a']), [[[0], [2]], [[1]]])
+
+    def test_duplicate_group_bridges_paths(self):
+        # group [1, 2] writes both 'q' and 'p', joining the batches of groups 0 and 3
+        self.assertEqual(gen._batch_by_output_path([[0], [1, 2], [3]], ['p', 'q', 'p', 'q']), [[[0], [1, 2], [3]]])
+        self.assertEqual(gen._batch_by_output_path([[0, 3], [1], [2]], ['a', 'b', 'c', 'b']), [[[0, 3], [1]], [[2]]])
+
+
+class TestMain(unittest.TestCase):
+
+    #
+    # main() with a generator that writes the notebook path as the test, finishing in random order
+    #
+    def run_main(self, notebooks_dir: str, output_dir: str) -> list:
+        calls = []
+
+        class FakeGenerator(gen.NotebookTestGenerator):
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def generate_tests(self, notebook_path, output_dir):
+                calls.append(notebook_path)
+                time.sleep(random.random() / 100)
+                output_path = self._test_output_path(notebook_path, output_dir)
+                os.makedirs(output_dir, exist_ok=True)
+                with open(output_path, 'w') as f:
+                    f.write(notebook_path)
+                return output_path
+
+        argv = ['ai_test_generator.py', '--notebooks-path', notebooks_dir, '--output-dir', output_dir, '--max-workers', '8']
+        env = {'AZURE_OPENAI_ENDPOINT': 'https://example', 'AZURE_OPENAI_API_KEY': 'key'}
+        with mock.patch.object(gen, 'NotebookTestGenerator', FakeGenerator), mock.patch.object(sys, 'argv', argv), \
+             mock.patch.dict(os.environ, env), contextlib.redirect_stdout(io.StringIO()):
+            gen.main()
+        return calls
+
+    def test_manifest_order_and_collisions(self):
+        with tempfile.TemporaryDirectory(prefix='nbs') as root:
+            notebooks_dir, output_dir = os.path.join(root, 'notebooks'), os.path.join(root, 'out')
+            # a/X and c/X are identical, b/X shares their name only, d/Y is a renamed copy
+            files = {'a/X.ipynb': '{"cells": [1]}', 'b/X.ipynb': '{"cells": [2]}', 'c/X.ipynb': '{"cells": [1]}',
+                     'd/Y.ipynb': '{"cells": [1]}', 'e/Z.ipynb': '{"cells": [3]}'}
+            for name, content in files.items():
+                os.makedirs(os.path.dirname(os.path.join(notebooks_dir, name)), exist_ok=True)
+                with open(os.path.join(notebooks_dir, name), 'w') as f:
+                    f.write(content)
+            path = lambda name: os.path.join(notebooks_dir, name)
+
+            for _ in range(5):
+                calls = self.run_main(notebooks_dir, output_dir)
+                # one call per content and test file name, made for the last notebook of each group
+                self.assertEqual(sorted(calls), [path('b/X.ipynb'), path('c/X.ipynb'), path('d/Y.ipynb'), path('e/Z.ipynb')])
+                # the shared test file holds the test of the last notebook (in sorted order) mapping to it
+                with open(os.path.join(output_dir, 'test_X.py')) as f:
+                    self.assertEqual(f.read(), path('c/X.ipynb'))
+                with open(os.path.join(output_dir, 'generated_tests_manifest.json')) as f:
+                    manifest = json.load(f)
+                self.assertEqual(manifest['notebooks_processed'], 5)
+                self.assertEqual(manifest['tests_generated'],
+                                 [os.path.join(output_dir, name) for name in ['test_X.py', 'test_Y.py', 'test_Z.py']])
+
+
+if __name__ == '__main__':
+    unittest.main()